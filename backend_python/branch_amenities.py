@@ -0,0 +1,65 @@
+"""
+Cached branch -> amenities map.
+
+Amenities belong to branches and almost never change, so instead of
+aggregating them with `json_agg` into every court listing row they are loaded
+once into a dict keyed by branch id and merged into court rows in Python.
+The map is reloaded after AMENITIES_CACHE_SECONDS, or straight away when the
+court catalog reloads (see `catalog`).
+"""
+import logging
+import os
+from sqlalchemy import text
+from ttl_store import TTLStore
+
+logger = logging.getLogger(__name__)
+
+AMENITIES_CACHE_SECONDS = int(os.getenv("AMENITIES_CACHE_SECONDS", "900"))
+
+AMENITIES_SQL = """
+    SELECT aba.branch_id, aa.id, aa.name, aa.description, aa.icon, aa.icon_url
+    FROM admin_branch_amenities aba
+    JOIN admin_amenities aa ON aba.amenity_id = aa.id AND aa.is_active = true
+    ORDER BY aba.branch_id, aa.name
+"""
+
+_cache = TTLStore(ttl=AMENITIES_CACHE_SECONDS, maxsize=1)
+
+
+def load(db) -> dict:
+    """Read every branch's active amenities and replace the cached map."""
+    amenity_map = {}
+    for row in db.execute(text(AMENITIES_SQL)):
+        amenity = row._mapping
+        amenity_map.setdefault(str(amenity['branch_id']), []).append({
+            "id": None if amenity['id'] is None else str(amenity['id']),
+            "name": amenity['name'],
+            "description": amenity['description'],
+            "icon": amenity['icon'],
+            "icon_url": amenity['icon_url'],
+        })
+    _cache.set("map", amenity_map)
+    logger.debug("Loaded amenities for %d branches", len(amenity_map))
+    return amenity_map
+
+
+def get_map(db) -> dict:
+    """Branch id -> list of amenity dicts, loaded on first use and cached.
+
+    The lists are shared; callers must not modify them.
+    """
+    amenity_map = _cache.get("map")
+    if amenity_map is None:
+        amenity_map = load(db)
+    return amenity_map
+
+
+def merge(courts: list[dict], amenity_map: dict) -> list[dict]:
+    """Set `amenities` on each court row from its `branch_id`."""
+    for court in courts:
+        court['amenities'] = amenity_map.get(str(court['branch_id']), [])
+    return courts
+
+
+def clear() -> None:
+    _cache.pop("map")
@@ -0,0 +1,208 @@
+"""
+In-process snapshot of the court catalog.
+
+Courts, branches, cities, game types and branch amenities change a few times
+a day, yet every listing request used to join them again. This module loads
+all active courts once into an immutable CatalogSnapshot with secondary
+indexes (by city, game type and branch, plus a geo grid of branch
+coordinates) so the listing endpoints filter in memory. The snapshot also
+carries the text search index (see `court_search`) and precomputed facet
+counts (see `court_facets`).
+
+The snapshot is held by a `snapshot_cache.SnapshotCache`: it is served for
+CATALOG_CHECK_SECONDS without touching the database, then one request
+compares a cheap signature of the admin tables (row counts and latest
+`updated_at`) and reloads only if it changed, and it is reloaded
+unconditionally after CATALOG_MAX_AGE_SECONDS.
+
+Set COURT_CATALOG_ENABLED=0 to make the listing, search and autocomplete
+endpoints query the database directly instead (e.g. when running several
+workers that must see admin edits immediately).
+"""
+import logging
+import os
+import time as time_module
+from sqlalchemy import text
+import branch_amenities
+import court_facets
+import court_search
+import geo
+from snapshot_cache import SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+CATALOG_ENABLED = os.getenv("COURT_CATALOG_ENABLED", "1") not in ("0", "false", "False")
+CATALOG_CHECK_SECONDS = int(os.getenv("COURT_CATALOG_CHECK_SECONDS", "30"))
+CATALOG_MAX_AGE_SECONDS = int(os.getenv("COURT_CATALOG_MAX_AGE_SECONDS", "600"))
+
+# Column aliases match the listing queries in routers/courts.py and
+# routers/venues.py, so catalog records and SQL rows format the same way.
+COURTS_SQL = """
+    SELECT
+        ac.id,
+        ac.name as court_name,
+        ac.price_per_hour as prices,
+        ac.images as photos,
+        ac.videos,
+        ac.terms_and_conditions,
+        ac.created_at,
+        ac.updated_at,
+        ac.branch_id,
+        ac.game_type_id,
+        ab.name as branch_name,
+        ab.address_line1 as location,
+        ab.search_location as description,
+        ab.city_id,
+        ab.latitude,
+        ab.longitude,
+        acity.name as city_name,
+        agt.name as game_type
+    FROM admin_courts ac
+    JOIN admin_branches ab ON ac.branch_id = ab.id
+    JOIN admin_cities acity ON ab.city_id = acity.id
+    JOIN admin_game_types agt ON ac.game_type_id = agt.id
+    WHERE ac.is_active = true
+    ORDER BY acity.name, ab.name, ac.name
+"""
+
+# Changes whenever any catalog table gains, loses or edits a row
+SIGNATURE_SQL = """
+    SELECT
+        (SELECT count(*) FROM admin_courts), (SELECT max(updated_at) FROM admin_courts),
+        (SELECT count(*) FROM admin_branches), (SELECT max(updated_at) FROM admin_branches),
+        (SELECT count(*) FROM admin_cities), (SELECT max(updated_at) FROM admin_cities),
+        (SELECT count(*) FROM admin_game_types), (SELECT max(updated_at) FROM admin_game_types),
+        (SELECT count(*) FROM admin_amenities),
+        (SELECT count(*) FROM admin_branch_amenities)
+"""
+
+
+def _normalize(value) -> str:
+    return str(value or "").strip().lower()
+
+
+class CatalogSnapshot:
+    """Immutable view of every active court plus lookup indexes.
+
+    Court records are plain dicts shared by every request; callers must copy
+    them before changing anything.
+    """
+
+    def __init__(self, courts: list[dict], signature=None):
+        self.courts = tuple(courts)
+        self.signature = signature
+        self.loaded_at = time_module.monotonic()
+
+        self.by_id = {}
+        self.by_city = {}  # lower-case city name -> courts
+        self.by_game_type = {}  # game type id -> courts
+        self.by_branch = {}  # branch id -> courts
+        for court in self.courts:
+            self.by_id[court['id']] = court
+            self.by_city.setdefault(_normalize(court['city_name']), []).append(court)
+            self.by_game_type.setdefault(court['game_type_id'], []).append(court)
+            self.by_branch.setdefault(court['branch_id'], []).append(court)
+
+        # Courts share their branch's coordinates, so the grid holds branches
+        self.geo = geo.GeoGrid(
+            (court_list[0]['latitude'], court_list[0]['longitude'], court_list)
+            for court_list in self.by_branch.values()
+            if court_list[0].get('latitude') is not None and court_list[0].get('longitude') is not None
+        )
+        self.search = court_search.CourtSearch(self.courts)
+
+        self.facets = {None: court_facets.compute(self.courts)}  # lower-case city name (None: all) -> facets
+        for city_key, court_list in self.by_city.items():
+            self.facets[city_key] = court_facets.compute(court_list)
+
+    def game_type_ids(self, game_type: str) -> set:
+        """Ids of game types whose name contains `game_type`, case-insensitively."""
+        needle = _normalize(game_type)
+        return {
+            court_list[0]['game_type_id']
+            for court_list in self.by_game_type.values()
+            if needle in _normalize(court_list[0]['game_type'])
+        }
+
+    def filter(self, city=None, game_type=None, branch_id=None) -> list[dict]:
+        """Active courts matching every given filter, in catalog order.
+
+        City matches case-insensitively, game type as a substring of the name
+        (like the `ILIKE '%x%'` it replaces). The most selective index that
+        applies picks the candidates; the other filters are checked on those.
+        """
+        city_key = _normalize(city) if city else None
+        wanted = self.game_type_ids(game_type) if game_type and game_type != "undefined" else None
+
+        if branch_id:
+            candidates = self.by_branch.get(str(branch_id), ())
+        elif city_key:
+            candidates = self.by_city.get(city_key, ())
+        elif wanted is not None and len(wanted) <= 1:
+            candidates = self.by_game_type.get(next(iter(wanted), None), ())
+        else:
+            candidates = self.courts
+
+        return [
+            court for court in candidates
+            if (city_key is None or _normalize(court['city_name']) == city_key)
+            and (wanted is None or court['game_type_id'] in wanted)
+        ]
+
+    def facets_for(self, city=None, game_type=None) -> dict:
+        """Facet counts of the courts `filter` would return; precomputed unless a game type is given."""
+        if game_type and game_type != "undefined":
+            return court_facets.compute(self.filter(city=city, game_type=game_type))
+        facets = self.facets.get(_normalize(city) if city else None)
+        return facets if facets is not None else court_facets.compute(())
+
+    def nearby(self, lat: float, lon: float, radius_km: float, game_type=None, limit=None) -> list[tuple]:
+        """(distance_km, court) for the `limit` courts nearest to a point, nearest first.
+
+        Only branches in grid cells overlapping the radius are looked at.
+        """
+        wanted = self.game_type_ids(game_type) if game_type and game_type != "undefined" else None
+        hits = []
+        for distance, court_list in self.geo.within(lat, lon, radius_km):
+            for court in court_list:
+                if wanted is None or court['game_type_id'] in wanted:
+                    hits.append((distance, court))
+                    if limit is not None and len(hits) >= limit:
+                        return hits
+        return hits
+
+
+def _str_or_none(value):
+    return None if value is None else str(value)
+
+
+def load_snapshot(db, signature=None) -> CatalogSnapshot:
+    """Read the whole catalog (courts, then branch amenities) and build a snapshot."""
+    # The catalog only reloads when something changed, so refresh amenities too
+    amenity_map = branch_amenities.load(db)
+
+    courts = []
+    for row in db.execute(text(COURTS_SQL)):
+        court = dict(row._mapping)
+        for key in ('id', 'branch_id', 'game_type_id', 'city_id'):
+            court[key] = _str_or_none(court[key])
+        for key in ('latitude', 'longitude'):
+            court[key] = None if court[key] is None else float(court[key])
+        courts.append(court)
+    branch_amenities.merge(courts, amenity_map)
+
+    snapshot = CatalogSnapshot(courts, signature)
+    logger.info(
+        "Loaded court catalog: %d courts, %d branches (%d with coordinates)",
+        len(snapshot.courts), len(snapshot.by_branch), len(snapshot.geo)
+    )
+    return snapshot
+
+
+catalog = SnapshotCache(
+    "Court catalog", SIGNATURE_SQL, load_snapshot, CATALOG_CHECK_SECONDS, CATALOG_MAX_AGE_SECONDS
+)
+
+
+def get_catalog(db) -> CatalogSnapshot:
+    return catalog.get(db)
@@ -0,0 +1,115 @@
+"""
+Response compression middleware: brotli when the optional `brotli` package is
+installed and the client accepts it, gzip otherwise.
+
+Only complete (non-streaming) bodies of at least COMPRESSION_MIN_BYTES with a
+compressible content type are compressed; small bodies cost more CPU to
+compress than they save on the wire. Levels favour speed over ratio since the
+API compresses every listing response on the fly.
+"""
+import gzip
+import os
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/msgpack", "application/x-msgpack", "text/")
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Codings from an Accept-Encoding header, minus those with q=0."""
+    encodings = set()
+    for entry in accept_encoding.split(","):
+        coding, *params = entry.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        refused = False
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    refused = float(value) <= 0
+                except ValueError:
+                    refused = True
+        if not refused:
+            encodings.add(coding)
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    encodings = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Hold the headers back until the first body chunk shows the size
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            content_type = headers.get("content-type", "").lower()
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                # Streaming, small, already encoded or binary media: send as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            passthrough = True
+            await send(start_message)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
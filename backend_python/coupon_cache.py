@@ -0,0 +1,180 @@
+"""
+In-process table of active coupons.
+
+The checkout screen lists the available coupons when it opens and validates
+the code on every keystroke, while coupons change a few times a week. All
+active coupons are loaded into a CouponTable keyed by normalized code, so
+validation is a dict lookup plus arithmetic.
+
+The list of currently valid coupons is derived once and kept until the next
+start or end boundary of any coupon, when it is derived again. The table is
+held by a `snapshot_cache.SnapshotCache` like the court catalog: served for
+COUPON_CHECK_SECONDS, then reloaded only if the signature of `admin_coupons`
+changed, and unconditionally after COUPON_MAX_AGE_SECONDS.
+"""
+import bisect
+import logging
+import os
+import threading
+import time as time_module
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from snapshot_cache import SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+COUPON_CHECK_SECONDS = int(os.getenv("COUPON_CHECK_SECONDS", "30"))
+COUPON_MAX_AGE_SECONDS = int(os.getenv("COUPON_MAX_AGE_SECONDS", "600"))
+
+COUPONS_SQL = """
+    SELECT code, discount_type, discount_value, min_order_value, max_discount,
+           description, start_date, end_date
+    FROM admin_coupons
+    WHERE is_active = true
+    ORDER BY code ASC
+"""
+
+# Changes whenever a coupon is added, removed or edited
+SIGNATURE_SQL = "SELECT count(*), max(updated_at) FROM admin_coupons"
+
+# A coupon is valid up to and including its end_date
+_AFTER_END = timedelta(microseconds=1)
+
+
+def normalize_code(code) -> str:
+    return str(code or "").strip().upper()
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Coupon dates are compared with `datetime.utcnow()`."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _float_or_none(value):
+    return None if value is None else float(value)
+
+
+class Coupon:
+    __slots__ = (
+        "code", "discount_type", "discount_value", "min_order_value", "max_discount",
+        "description", "start_date", "end_date",
+    )
+
+    def __init__(self, row):
+        self.code = row['code']
+        self.discount_type = row['discount_type']
+        self.discount_value = float(row['discount_value'])
+        self.min_order_value = _float_or_none(row['min_order_value'])
+        self.max_discount = _float_or_none(row['max_discount'])
+        self.description = row['description']
+        self.start_date = _naive_utc(row['start_date'])
+        self.end_date = _naive_utc(row['end_date'])
+
+    def is_valid_at(self, now: datetime) -> bool:
+        return self.start_date <= now <= self.end_date
+
+    def summary(self) -> dict:
+        """The GET /coupons/available entry."""
+        return {
+            "code": self.code,
+            "discount_type": self.discount_type,
+            "discount_value": self.discount_value,
+            "min_order_value": self.min_order_value,
+            "description": self.description or "",
+        }
+
+
+class CouponTable:
+    """Active coupons by normalized code plus the currently valid list."""
+
+    def __init__(self, coupons: list[Coupon], signature=None):
+        self.coupons = tuple(coupons)
+        self.by_code = {normalize_code(coupon.code): coupon for coupon in self.coupons}
+        self.signature = signature
+        self.loaded_at = time_module.monotonic()
+
+        # Instants at which the set of valid coupons can change
+        self._boundaries = sorted(
+            {coupon.start_date for coupon in self.coupons} | {coupon.end_date + _AFTER_END for coupon in self.coupons}
+        )
+        self._lock = threading.Lock()
+        self._window = (datetime.max, datetime.min, [])  # (from, until, summaries)
+
+    def get(self, code) -> Coupon | None:
+        return self.by_code.get(normalize_code(code))
+
+    def available(self, now: datetime | None = None) -> list[dict]:
+        """Summaries of the coupons valid at `now`, by code.
+
+        Between two boundaries the list cannot change, so it is only derived
+        again once `now` leaves the window it was derived for.
+        """
+        now = now or datetime.utcnow()
+        window = self._window
+        if not window[0] <= now < window[1]:
+            with self._lock:
+                window = self._window
+                if not window[0] <= now < window[1]:
+                    position = bisect.bisect_right(self._boundaries, now)
+                    window = (
+                        self._boundaries[position - 1] if position else datetime.min,
+                        self._boundaries[position] if position < len(self._boundaries) else datetime.max,
+                        [coupon.summary() for coupon in self.coupons if coupon.is_valid_at(now)],
+                    )
+                    self._window = window
+        return window[2]
+
+    def validate(self, code, total_amount: float, now: datetime | None = None) -> dict:
+        """CouponResponse fields for applying `code` to an order of `total_amount`."""
+        coupon = self.get(code)
+        if coupon is None:
+            return {"valid": False, "message": "Invalid coupon code"}
+
+        # Check if coupon is within valid date range
+        if not coupon.is_valid_at(now or datetime.utcnow()):
+            return {"valid": False, "message": "Coupon has expired or is not yet valid"}
+
+        # Check minimum order value
+        if coupon.min_order_value and total_amount < coupon.min_order_value:
+            return {
+                "valid": False,
+                "message": f"Order value must be at least ₹{coupon.min_order_value} to use this coupon"
+            }
+
+        # Calculate discount based on type
+        if coupon.discount_type.lower() == 'percentage':
+            discount_amount = (total_amount * coupon.discount_value) / 100
+            discount_percentage = coupon.discount_value
+        else:  # fixed amount
+            discount_amount = coupon.discount_value
+            discount_percentage = (discount_amount / total_amount) * 100
+
+        # Apply max discount limit if set
+        if coupon.max_discount and discount_amount > coupon.max_discount:
+            discount_amount = coupon.max_discount
+
+        # Ensure final amount is not negative
+        final_amount = max(0, total_amount - discount_amount)
+
+        return {
+            "valid": True,
+            "discount_percentage": round(discount_percentage, 2),
+            "discount_amount": round(discount_amount, 2),
+            "final_amount": round(final_amount, 2),
+            "message": f"Valid coupon: {discount_percentage}% discount applied"
+        }
+
+
+def load_table(db, signature=None) -> CouponTable:
+    table = CouponTable([Coupon(row._mapping) for row in db.execute(text(COUPONS_SQL))], signature)
+    logger.info("Loaded %d active coupons", len(table.coupons))
+    return table
+
+
+coupons = SnapshotCache("Coupon table", SIGNATURE_SQL, load_table, COUPON_CHECK_SECONDS, COUPON_MAX_AGE_SECONDS)
+
+
+def get_coupons(db) -> CouponTable:
+    return coupons.get(db)
@@ -0,0 +1,66 @@
+"""
+Facet counts for the court discovery screen: active courts per city, game
+type, branch and price band.
+
+Catalog snapshots precompute the facets of every city (and of the whole
+catalog) when they load, so the chips are refreshed together with the
+snapshot and a request only picks a dict. Narrower filters (a game type)
+are counted on the fly from the filtered courts.
+"""
+import os
+
+# Upper bounds (exclusive) of the hourly price bands; the last band is open-ended
+PRICE_BAND_EDGES = tuple(
+    int(edge) for edge in os.getenv("COURT_PRICE_BAND_EDGES", "500,1000,2000").split(",") if edge.strip()
+)
+
+# Columns compute() reads, for the SQL path
+FACET_COLUMNS = ("prices", "branch_id", "branch_name", "city_name", "game_type")
+
+
+def _price(court):
+    try:
+        return float(court.get('prices') or 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ranked(counts: dict) -> list[dict]:
+    """Most courts first, then by name."""
+    return sorted(counts.values(), key=lambda facet: (-facet["count"], str(facet["name"]).lower()))
+
+
+def compute(courts) -> dict:
+    cities, game_types, branches = {}, {}, {}
+    bands = [0] * (len(PRICE_BAND_EDGES) + 1)
+    total = 0
+    for court in courts:
+        total += 1
+        city = court.get('city_name') or ''
+        cities.setdefault(city.lower(), {"name": city, "count": 0})["count"] += 1
+        game_type = court.get('game_type') or ''
+        game_types.setdefault(game_type.lower(), {"name": game_type, "count": 0})["count"] += 1
+        branch_id = str(court.get('branch_id'))
+        branches.setdefault(
+            branch_id, {"id": branch_id, "name": court.get('branch_name') or '', "city": city, "count": 0}
+        )["count"] += 1
+
+        price = _price(court)
+        if price is not None:
+            band = 0
+            while band < len(PRICE_BAND_EDGES) and price >= PRICE_BAND_EDGES[band]:
+                band += 1
+            bands[band] += 1
+
+    lower_bounds = (0,) + PRICE_BAND_EDGES
+    upper_bounds = PRICE_BAND_EDGES + (None,)
+    return {
+        "total": total,
+        "cities": _ranked(cities),
+        "game_types": _ranked(game_types),
+        "branches": _ranked(branches),
+        "price_bands": [
+            {"min": low, "max": high, "count": count}
+            for low, high, count in zip(lower_bounds, upper_bounds, bands)
+        ],
+    }
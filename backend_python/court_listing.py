@@ -0,0 +1,165 @@
+"""
+Shaping of the /courts and /venues listings: sparse fieldsets, sorting and
+cursor pagination.
+
+Both listings start from court rows keyed by the column aliases in
+`court_queries` (catalog records or SQL rows). `fields=` picks which output
+fields are built, and on the SQL path which columns are fetched; `sort=`
+orders by name, price or popularity; `limit`/`cursor` return one page at a
+time, with the cursor carrying the sort key of the last court served.
+"""
+import base64
+import bisect
+import json
+import os
+from datetime import timedelta
+from sqlalchemy import text
+from ttl_store import TTLStore
+import venue_time
+
+MAX_PAGE_SIZE = 100
+POPULARITY_DAYS = int(os.getenv("COURT_POPULARITY_DAYS", "30"))
+POPULARITY_CACHE_SECONDS = int(os.getenv("COURT_POPULARITY_CACHE_SECONDS", "600"))
+
+SORTS = ("name", "price", "popularity")
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+# Output field -> (columns it is built from, builder)
+FIELDS = {
+    "id": (("id",), lambda c: str(c['id'])),
+    "court_name": (("court_name",), lambda c: c.get('court_name', '')),
+    "location": (("location", "city_name"), lambda c: f"{c.get('location', '')}, {c.get('city_name', '')}"),
+    "game_type": (("game_type",), lambda c: c.get('game_type', '')),
+    "prices": (("prices",), lambda c: str(c.get('prices', '0'))),
+    "description": (
+        ("description", "branch_name", "game_type"),
+        lambda c: c.get('description', '') or f"{c.get('branch_name', '')} - {c.get('game_type', '')} Court",
+    ),
+    "terms_and_conditions": (("terms_and_conditions",), lambda c: c.get('terms_and_conditions', '')),
+    "amenities": (("branch_id",), lambda c: c.get('amenities', []) or []),
+    "photos": (("photos",), lambda c: c.get('photos', []) or []),
+    "videos": (("videos",), lambda c: c.get('videos', []) or []),
+    "created_at": (("created_at",), lambda c: _iso(c.get('created_at'))),
+    "updated_at": (("updated_at",), lambda c: _iso(c.get('updated_at'))),
+}
+
+COURT_FIELDS = tuple(FIELDS)
+VENUE_FIELDS = tuple(field for field in FIELDS if field not in ("terms_and_conditions", "amenities"))
+
+# Columns each sort order reads
+_SORT_COLUMNS = {
+    None: ("city_name", "branch_name", "court_name"),
+    "name": ("court_name",),
+    "price": ("prices",),
+    "popularity": ("court_name",),
+}
+
+
+def parse_fields(fields: str | None, allowed: tuple) -> tuple:
+    """Requested output fields in `allowed` order; raises ValueError for unknown ones."""
+    if not fields:
+        return allowed
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}")
+    return tuple(field for field in allowed if field in requested | {"id"})
+
+
+def columns_for(fields: tuple, sort: str | None) -> tuple:
+    """Columns needed to build `fields` and apply `sort`."""
+    columns = {"id"}
+    for field in fields:
+        columns.update(FIELDS[field][0])
+    columns.update(_SORT_COLUMNS[sort])
+    return tuple(columns)
+
+
+def format_court(court: dict, fields: tuple) -> dict:
+    return {field: FIELDS[field][1](court) for field in fields}
+
+
+_popularity = TTLStore(ttl=POPULARITY_CACHE_SECONDS, maxsize=1)
+
+
+def popularity(db) -> dict:
+    """Court id -> bookings over the last POPULARITY_DAYS, cached."""
+    counts = _popularity.get("counts")
+    if counts is None:
+        rows = db.execute(
+            text("""
+                SELECT court_id, count(*) AS bookings
+                FROM booking
+                WHERE booking_date >= :since AND status != 'cancelled'
+                GROUP BY court_id
+            """),
+            {"since": venue_time.today() - timedelta(days=POPULARITY_DAYS)}
+        )
+        counts = {str(court_id): bookings for court_id, bookings in rows}
+        _popularity.set("counts", counts)
+    return counts
+
+
+def _sort_key(sort: str | None, counts: dict | None):
+    """Total order for a sort; ties are broken by court id."""
+    if sort == "name":
+        return lambda c: (str(c.get('court_name') or '').lower(), str(c['id']))
+    if sort == "price":
+        return lambda c: (float(c.get('prices') or 0), str(c['id']))
+    if sort == "popularity":
+        return lambda c: (-counts.get(str(c['id']), 0), str(c.get('court_name') or '').lower(), str(c['id']))
+    return lambda c: (
+        str(c.get('city_name') or '').lower(), str(c.get('branch_name') or '').lower(),
+        str(c.get('court_name') or '').lower(), str(c['id']),
+    )
+
+
+# Field types of each sort's key, as decoded from a cursor's JSON
+_KEY_TYPES = {
+    "name": (str, str),
+    "price": ((int, float), str),
+    "popularity": (int, str, str),
+    None: (str, str, str, str),
+}
+
+
+def _encode_cursor(sort: str | None, key: tuple) -> str:
+    raw = json.dumps([sort, list(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str | None) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_sort, key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if cursor_sort != sort:
+        raise ValueError("Cursor was issued for a different sort order")
+    types = _KEY_TYPES.get(sort)
+    if (
+        not isinstance(key, list) or types is None or len(key) != len(types)
+        or not all(isinstance(value, type_) and not isinstance(value, bool) for value, type_ in zip(key, types))
+    ):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+def paginate(db, courts: list[dict], sort: str | None, limit: int | None, cursor: str | None):
+    """Sort `courts` and cut out one page; returns (page, next_cursor).
+
+    Without a limit every court after the cursor is returned.
+    """
+    key = _sort_key(sort, popularity(db) if sort == "popularity" else None)
+    ordered = sorted(courts, key=key)
+    if cursor:
+        after = _decode_cursor(cursor, sort)
+        ordered = ordered[bisect.bisect_right(ordered, after, key=key):]
+    if limit is None or len(ordered) <= limit:
+        return ordered, None
+    page = ordered[:limit]
+    return page, _encode_cursor(sort, key(page[-1]))
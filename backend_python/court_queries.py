@@ -0,0 +1,157 @@
+"""
+Parameterized court listing queries shared by the courts and venues routers.
+
+Statements are assembled from a fixed column list and filter set, built once
+per combination and cached, so the SQL text never depends on user input and
+Postgres sees a small, fixed set of statements. Game type
+filters are resolved to `game_type_id`s through a cached lookup of the
+game types table, so the statement filters on an indexed id instead of
+`agt.name ILIKE '%x%'`.
+
+These statements serve the listing, search and autocomplete endpoints when
+the in-memory catalog is disabled (COURT_CATALOG_ENABLED=0); see `catalog`.
+"""
+import logging
+import os
+from functools import lru_cache
+from sqlalchemy import bindparam, text
+from sqlalchemy.sql.elements import TextClause
+import branch_amenities
+from logging_config import SAMPLED
+from ttl_store import TTLStore
+
+logger = logging.getLogger(__name__)
+
+GAME_TYPE_CACHE_SECONDS = int(os.getenv("GAME_TYPE_CACHE_SECONDS", "300"))
+
+_FROM = """
+    FROM admin_courts ac
+    JOIN admin_branches ab ON ac.branch_id = ab.id
+    JOIN admin_cities acity ON ab.city_id = acity.id
+    JOIN admin_game_types agt ON ac.game_type_id = agt.id
+"""
+
+# Result alias -> SQL expression; also the canonical column order
+COLUMNS = {
+    "id": "ac.id",
+    "court_name": "ac.name as court_name",
+    "prices": "ac.price_per_hour as prices",
+    "photos": "ac.images as photos",
+    "videos": "ac.videos",
+    "terms_and_conditions": "ac.terms_and_conditions",
+    "created_at": "ac.created_at",
+    "updated_at": "ac.updated_at",
+    "branch_id": "ac.branch_id",
+    "branch_name": "ab.name as branch_name",
+    "location": "ab.address_line1 as location",
+    "description": "ab.search_location as description",
+    "city_name": "acity.name as city_name",
+    "game_type": "agt.name as game_type",
+    "latitude": "ab.latitude",
+    "longitude": "ab.longitude",
+}
+
+# Columns of each listing when the caller does not narrow them down
+COURT_COLUMNS = (
+    "id", "court_name", "prices", "photos", "videos", "terms_and_conditions", "created_at", "updated_at",
+    "branch_id", "branch_name", "location", "description", "city_name", "game_type",
+)
+VENUE_COLUMNS = (
+    "id", "court_name", "prices", "photos", "videos", "created_at", "updated_at",
+    "branch_name", "location", "description", "city_name", "game_type",
+)
+MATCHING_COLUMNS = ("id", "court_name", "updated_at", "branch_id", "branch_name", "game_type")
+NEARBY_COLUMNS = ("latitude", "longitude")
+# Fields indexed by `court_search.CourtSearch`
+SEARCH_COLUMNS = ("court_name", "branch_name", "location", "description", "city_name")
+
+_ORDER_BY = " ORDER BY acity.name, ab.name, ac.name"
+
+
+@lru_cache(maxsize=256)
+def listing_statement(
+    columns: tuple, by_city: bool, by_game_type: bool, by_branch: bool, by_box: bool = False
+) -> TextClause:
+    """The statement for one column set and filter combination, built once.
+
+    `columns` must be in COLUMNS order so equal sets share a statement.
+    """
+    where_conditions = ["ac.is_active = true"]
+    if by_branch:
+        where_conditions.append("ac.branch_id = :branch_id")
+    if by_city:
+        where_conditions.append("LOWER(acity.name) = LOWER(:city)")
+    if by_game_type:
+        where_conditions.append("ac.game_type_id IN :game_type_ids")
+    if by_box:
+        where_conditions.append("ab.latitude BETWEEN :min_lat AND :max_lat")
+        where_conditions.append("ab.longitude BETWEEN :min_lon AND :max_lon")
+
+    select_sql = "SELECT " + ", ".join(COLUMNS[column] for column in columns) + _FROM
+    statement = text(select_sql + " WHERE " + " AND ".join(where_conditions) + _ORDER_BY)
+    if by_game_type:
+        statement = statement.bindparams(bindparam("game_type_ids", expanding=True))
+    return statement
+
+
+_game_types = TTLStore(ttl=GAME_TYPE_CACHE_SECONDS, maxsize=1)
+
+
+def _all_game_types(db) -> list[tuple]:
+    """(id, lower-case name) of every game type, cached."""
+    game_types = _game_types.get("all")
+    if game_types is None:
+        game_types = [
+            (str(row.id), str(row.name).lower())
+            for row in db.execute(text("SELECT id, name FROM admin_game_types"))
+        ]
+        _game_types.set("all", game_types)
+    return game_types
+
+
+def game_type_ids(db, game_type: str) -> list[str]:
+    """Ids of game types whose name contains `game_type`, case-insensitively."""
+    needle = game_type.strip().lower()
+    return [game_type_id for game_type_id, name in _all_game_types(db) if needle in name]
+
+
+def list_courts(
+    db,
+    columns=COURT_COLUMNS,
+    city=None,
+    game_type=None,
+    branch_id=None,
+    with_amenities: bool = False,
+    box=None,
+) -> list[dict]:
+    """Active courts as dicts keyed by column alias.
+
+    Only `columns` (plus `id`) are fetched. With `with_amenities`, each row
+    also gets its branch's `amenities` from the cached map. `box` is a
+    (min_lat, max_lat, min_lon, max_lon) bounding box from `geo.bounding_box`
+    the branch coordinates must fall in.
+    """
+    wanted = set(columns) | {"id"}
+    if with_amenities:
+        wanted.add("branch_id")
+    columns = tuple(column for column in COLUMNS if column in wanted)
+
+    params = {}
+    if city:
+        params['city'] = city.strip()  # Remove trailing spaces
+    if branch_id:
+        params['branch_id'] = branch_id
+    if box:
+        params['min_lat'], params['max_lat'], params['min_lon'], params['max_lon'] = box
+    by_game_type = bool(game_type) and game_type != "undefined"
+    if by_game_type:
+        params['game_type_ids'] = game_type_ids(db, game_type)
+        if not params['game_type_ids']:
+            return []
+
+    statement = listing_statement(columns, bool(city), by_game_type, bool(branch_id), bool(box))
+    logger.debug("Listing %s with %s", columns, params, extra=SAMPLED)
+    courts = [dict(row._mapping) for row in db.execute(statement, params)]
+    if with_amenities:
+        branch_amenities.merge(courts, branch_amenities.get_map(db))
+    return courts
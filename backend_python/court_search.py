@@ -0,0 +1,181 @@
+"""
+In-memory, typo-tolerant search over the court catalog.
+
+Every catalog snapshot builds a CourtSearch from its courts. Court names,
+branch names, addresses (`address_line1`), search locations and city names
+are split into lower-case, accent-free terms, and each query token is matched
+against that vocabulary three ways:
+
+- exactly;
+- as a prefix, for the token still being typed (autocomplete);
+- by trigram similarity, as `pg_trgm` would (tokens of MIN_FUZZY_LENGTH
+  characters or more), so "badmintn" still finds "badminton".
+
+A court matches when every query token matches one of its terms; its score
+is the sum over tokens of the best match score times the field weight. The
+vocabulary is a few thousand terms at most, so a query is a handful of dict
+and bisect lookups and stays well under a millisecond.
+"""
+import bisect
+import re
+import unicodedata
+from collections import Counter
+
+MIN_FUZZY_LENGTH = 3
+SIMILARITY_THRESHOLD = 0.3  # pg_trgm's default
+MAX_PREFIX_TERMS = 50
+
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.7  # times the trigram similarity
+
+# Catalog field -> weight in court search
+COURT_FIELD_WEIGHTS = {
+    "court_name": 3.0,
+    "branch_name": 3.0,
+    "description": 2.0,  # admin_branches.search_location
+    "location": 1.5,  # admin_branches.address_line1
+    "city_name": 1.0,
+}
+
+# Catalog field -> suggestion type, in the order duplicates are resolved
+SUGGESTION_TYPES = {
+    "branch_name": "venue",
+    "court_name": "court",
+    "description": "area",
+    "location": "area",
+    "city_name": "city",
+}
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text) -> str:
+    """Lower-case, accent-free text with runs of punctuation folded to one space."""
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def tokenize(text) -> list[str]:
+    return normalize(text).split()
+
+
+def trigrams(term: str) -> set[str]:
+    """Trigrams of a term padded like pg_trgm: two spaces before, one after."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TextIndex:
+    """Inverted index from terms to documents plus a trigram index over the terms."""
+
+    def __init__(self, documents):
+        """`documents` yields (item, [(text, weight), ...])."""
+        self.items = []
+        postings = {}  # term -> {document number: best field weight}
+        for number, (item, fields) in enumerate(documents):
+            self.items.append(item)
+            for text, weight in fields:
+                for term in tokenize(text):
+                    documents_with_term = postings.setdefault(term, {})
+                    if weight > documents_with_term.get(number, 0):
+                        documents_with_term[number] = weight
+
+        self.terms = sorted(postings)  # sorted for prefix lookups
+        self._postings = [postings[term] for term in self.terms]
+        self._term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+        self._trigram_counts = []
+        self._terms_by_trigram = {}
+        for term_id, term in enumerate(self.terms):
+            term_trigrams = trigrams(term)
+            self._trigram_counts.append(len(term_trigrams))
+            for trigram in term_trigrams:
+                self._terms_by_trigram.setdefault(trigram, []).append(term_id)
+
+    def _matching_terms(self, token: str, prefix: bool) -> dict[int, float]:
+        """Term id -> match score for one query token."""
+        matches = {}
+        term_id = self._term_ids.get(token)
+        if term_id is not None:
+            matches[term_id] = EXACT_SCORE
+
+        if prefix:
+            start = bisect.bisect_left(self.terms, token)
+            for term_id in range(start, min(start + MAX_PREFIX_TERMS, len(self.terms))):
+                if not self.terms[term_id].startswith(token):
+                    break
+                matches.setdefault(term_id, PREFIX_SCORE)
+
+        if len(token) >= MIN_FUZZY_LENGTH:
+            token_trigrams = trigrams(token)
+            shared = Counter()
+            for trigram in token_trigrams:
+                shared.update(self._terms_by_trigram.get(trigram, ()))
+            for term_id, count in shared.items():
+                similarity = count / (len(token_trigrams) + self._trigram_counts[term_id] - count)
+                if similarity >= SIMILARITY_THRESHOLD:
+                    score = FUZZY_SCORE * similarity
+                    if score > matches.get(term_id, 0):
+                        matches[term_id] = score
+        return matches
+
+    def search(self, query: str, limit=None, allowed=None) -> list[tuple]:
+        """(score, item) of the documents matching every token of `query`, best first.
+
+        The last token also matches as a prefix. `allowed`, if given, is a
+        predicate on items; ties keep index order.
+        """
+        tokens = tokenize(query)
+        totals = None
+        for position, token in enumerate(tokens):
+            best = {}
+            for term_id, score in self._matching_terms(token, prefix=position == len(tokens) - 1).items():
+                for number, weight in self._postings[term_id].items():
+                    if score * weight > best.get(number, 0):
+                        best[number] = score * weight
+            if totals is None:
+                totals = best
+            else:
+                totals = {number: totals[number] + score for number, score in best.items() if number in totals}
+            if not totals:
+                return []
+
+        ranked = sorted((totals or {}).items(), key=lambda entry: (-entry[1], entry[0]))
+        hits = []
+        for number, score in ranked:
+            item = self.items[number]
+            if allowed is None or allowed(item):
+                hits.append((score, item))
+                if limit is not None and len(hits) >= limit:
+                    break
+        return hits
+
+
+class CourtSearch:
+    """Court search and autocomplete suggestions for one catalog snapshot."""
+
+    def __init__(self, courts):
+        self.courts = TextIndex(
+            (court, [(court.get(field), weight) for field, weight in COURT_FIELD_WEIGHTS.items()])
+            for court in courts
+        )
+
+        # One suggestion per distinct normalized text
+        suggestions = {}
+        for field, suggestion_type in SUGGESTION_TYPES.items():
+            for court in courts:
+                text = court.get(field)
+                key = normalize(text)
+                if key and key not in suggestions:
+                    suggestions[key] = {"text": str(text).strip(), "type": suggestion_type}
+        self.suggestions = TextIndex(
+            (suggestion, [(suggestion["text"], 1.0)]) for suggestion in suggestions.values()
+        )
+
+    def search(self, query: str, limit=None, allowed=None) -> list[tuple]:
+        """(score, court) best first; see TextIndex.search."""
+        return self.courts.search(query, limit=limit, allowed=allowed)
+
+    def suggest(self, query: str, limit: int) -> list[dict]:
+        """Venue, court, area and city names completing `query`."""
+        return [suggestion for _, suggestion in self.suggestions.search(query, limit=limit)]
@@ -1,14 +1,29 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 import models, schemas
+import logging
+import occupancy
+import slot_templates
+import venue_time
 from passlib.context import CryptContext
 import uuid
-from datetime import timedelta, datetime
+import base64
+from datetime import timedelta, datetime, date, time
 import random
-from sqlalchemy import and_
+import re
+from sqlalchemy import and_, bindparam, column, insert, literal, table, text, tuple_
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# PostgreSQL SQLSTATE for exclusion constraint violations
+EXCLUSION_VIOLATION = "23P01"
+
+class SlotConflictError(ValueError):
+    """The requested court time overlaps an existing booking."""
+
 def get_password_hash(password):
     return pwd_context.hash(password)
 
@@ -91,114 +106,272 @@ def create_or_update_profile(db: Session, profile: schemas.ProfileCreate, user_i
     db.refresh(db_profile)
     return db_profile
 
+_CLOCK_TIME = re.compile(r'(\d{1,2}):(\d{2})(?:\s*([AaPp][Mm]))?')
+
+def parse_clock_time(value) -> str | None:
+    """Strict "HH:MM" / "hh:MM AM" parsing to 24-hour "HH:MM"; None if invalid."""
+    match = _CLOCK_TIME.fullmatch(str(value).strip())
+    if not match:
+        return None
+    hour, minute, ampm = int(match.group(1)), int(match.group(2)), match.group(3)
+    if minute > 59:
+        return None
+    if ampm:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ampm.upper() == 'PM' else 0)
+    elif hour > 23:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+def _booking_values(booking: schemas.BookingCreate, user_id: str, template: slot_templates.CourtTemplate) -> dict:
+    """Column values for a new booking row, with times parsed and totals computed.
+
+    Prices come from the court's compiled template; the price_per_hour sent by
+    the client is ignored.
+    """
+    start_time_str = parse_clock_time(booking.start_time)
+    if start_time_str is None:
+        raise ValueError(f"Invalid start_time: {booking.start_time!r}")
+
+    # Calculate end_time using string time
+    start_dt = datetime.strptime(start_time_str, '%H:%M').time()
+    start_datetime = datetime.combine(booking.booking_date, start_dt)
+    end_time = (start_datetime + timedelta(minutes=booking.duration_minutes)).time()
+
+    quote = template.quote(
+        booking.booking_date,
+        occupancy.parse_minutes(start_dt),
+        booking.duration_minutes,
+        booking.number_of_players,
+    )
+    price_per_hour = quote['price_per_hour']
+    total_amount = quote['total_amount']
+
+    # Don't set id - let PostgreSQL generate it with uuid_generate_v4()
+    return {
+        "user_id": user_id,
+        "court_id": str(booking.court_id),
+        "booking_date": booking.booking_date,
+        "start_time": start_dt,
+        "end_time": end_time,
+        "duration_minutes": booking.duration_minutes,
+        "number_of_players": booking.number_of_players,
+        "team_name": booking.team_name,
+        "special_requests": booking.special_requests,
+        "price_per_hour": price_per_hour,
+        "total_amount": total_amount,
+        # Mark booking as confirmed immediately on successful creation.
+        # Payment can still be tracked separately via payment_status.
+        "status": "confirmed",
+        "payment_status": "pending"
+    }
+
+def _conflict_message(values: dict) -> str:
+    return (
+        f"Court {values['court_id']} is already booked on {values['booking_date']} "
+        f"at {values['start_time'].strftime('%H:%M')}"
+    )
+
+# Validates the court, claims the court-day cells and inserts the booking in a
+# single round trip. The claim upsert locks only this (court_id, booking_date)
+# row, so concurrent bookings for the same court-day queue behind each other
+# while other courts and days proceed in parallel; its overlap check runs
+# against the latest committed row, so exactly one overlapping claim wins.
+# Nothing is claimed unless the court's updated_at still equals the version of
+# the template the price was quoted from.
+# Always returns one row: court_found = 0 means the court does not exist, a
+# NULL id means the cells were already taken or court_version has moved on.
+CREATE_BOOKING_SQL = """
+    WITH court AS (
+        SELECT id, updated_at FROM admin_courts WHERE id = :court_id AND is_active = true
+    ), claim AS (
+        INSERT INTO court_day_availability (court_id, booking_date, occupancy, version, updated_at)
+        SELECT id, :booking_date, CAST(:occupancy AS BIT(96)), 1, now() FROM court
+        WHERE updated_at IS NOT DISTINCT FROM CAST(:court_version AS TIMESTAMPTZ)
+        ON CONFLICT (court_id, booking_date) DO UPDATE
+        SET occupancy = court_day_availability.occupancy | EXCLUDED.occupancy,
+            version = court_day_availability.version + 1,
+            updated_at = now()
+        WHERE (court_day_availability.occupancy & EXCLUDED.occupancy) = CAST(:free AS BIT(96))
+        RETURNING court_id
+    ), inserted AS (
+        INSERT INTO booking (
+            user_id, court_id, booking_date, start_time, end_time, duration_minutes,
+            number_of_players, team_name, special_requests, price_per_hour, total_amount,
+            status, payment_status
+        )
+        SELECT
+            CAST(:user_id AS UUID), court_id, :booking_date, :start_time, :end_time, :duration_minutes,
+            :number_of_players, :team_name, :special_requests, :price_per_hour, :total_amount,
+            :status, :payment_status
+        FROM claim
+        RETURNING *
+    )
+    SELECT (SELECT count(*) FROM court) AS court_found,
+           (SELECT updated_at FROM court) AS court_version,
+           inserted.*
+    FROM (SELECT 1) AS one
+    LEFT JOIN inserted ON true
+"""
+
+BOOKING_COLUMNS = [column.key for column in models.Booking.__table__.columns]
+
+def _court_not_found(court_id) -> ValueError:
+    logger.warning("Court %s does not exist in admin_courts", court_id)
+    return ValueError(f"Court {court_id} not found in admin_courts table")
+
 def create_booking(db: Session, booking: schemas.BookingCreate, user_id: str):
+    """Create a booking in one statement and one commit.
+
+    `user_id` must belong to an already-authenticated user (the router passes
+    `get_current_user().id`), so it is not looked up again; the users foreign
+    key still guards against anything else.
+
+    The price is quoted from the cached court template without reading the
+    court first; the statement only books if the template is still current,
+    otherwise it is recompiled and the statement retried once.
+    """
     try:
-        print(f"[CRUD BOOKING] Starting booking creation for user: {user_id}")
-
-        # Parse time from AM/PM format to 24-hour format
-        import re
-        time_str = str(booking.start_time).strip()
-        print(f"[CRUD BOOKING] Parsing time: {time_str}")
-
-        # If already in HH:MM format, use as is
-        if re.match(r'^\d{1,2}:\d{2}$', time_str):
-            start_time_str = time_str
-        else:
-            # Handle AM/PM format
-            match = re.match(r'(\d{1,2}):(\d{2})\s*(AM|PM|am|pm)?', time_str)
-            if match:
-                hour = int(match.group(1))
-                minute = int(match.group(2))
-                ampm = match.group(3)
-
-                if ampm and ampm.upper() == 'PM' and hour != 12:
-                    hour += 12
-                elif ampm and ampm.upper() == 'AM' and hour == 12:
-                    hour = 0
-
-                start_time_str = f"{hour:02d}:{minute:02d}"
-            else:
-                start_time_str = "10:00"  # Default fallback
-
-        print(f"[CRUD BOOKING] Parsed time to: {start_time_str}")
-
-        # Calculate end_time using string time
-        from datetime import datetime as dt
-        start_dt = dt.strptime(start_time_str, '%H:%M').time()
-        start_datetime = dt.combine(booking.booking_date, start_dt)
-        end_dt = start_datetime + timedelta(minutes=booking.duration_minutes)
-        end_time = end_dt.time()
-
-        price_per_hour = booking.price_per_hour or 200.0 # Use selected price or default
-        number_of_players = booking.number_of_players or 2
-        total_amount = price_per_hour * (booking.duration_minutes / 60.0) * number_of_players
-
-        print(f"[CRUD BOOKING] Calculations: price_per_hour={price_per_hour}, duration_minutes={booking.duration_minutes}, number_of_players={number_of_players}, total_amount={total_amount}")
-
-        # Check if court exists in admin_courts table
-        from sqlalchemy import text
-        court_check = db.execute(
-            text("SELECT id FROM admin_courts WHERE id = :court_id"),
-            {"court_id": str(booking.court_id)}
-        ).fetchone()
-        
-        if not court_check:
-            print(f"[CRUD BOOKING] ERROR: Court {booking.court_id} does not exist in admin_courts")
-            raise ValueError(f"Court {booking.court_id} not found in admin_courts table")
-        
-        print(f"[CRUD BOOKING] ✅ Court {booking.court_id} found in admin_courts")
-
-        # Check if user exists
-        user_exists = db.query(models.User).filter(models.User.id == user_id).first()
-        if not user_exists:
-            print(f"[CRUD BOOKING] ERROR: User {user_id} does not exist")
-            raise ValueError(f"User {user_id} not found")
-
-        # Don't set id - let PostgreSQL generate it with uuid_generate_v4()
-        booking_data = {
-            "user_id": user_id,
-            "court_id": booking.court_id,  # Changed from venue_id to court_id
-            "booking_date": booking.booking_date,
-            "start_time": booking.start_time,
-            "end_time": end_time,
-            "duration_minutes": booking.duration_minutes,
-            "number_of_players": number_of_players,
-            "team_name": booking.team_name,
-            "special_requests": booking.special_requests,
-            "price_per_hour": price_per_hour,
-            "total_amount": total_amount,
-            # Mark booking as confirmed immediately on successful creation.
-            # Payment can still be tracked separately via payment_status.
-            "status": "confirmed",
-            "payment_status": "pending"
-        }
+        logger.debug("Starting booking creation for user: %s", user_id)
+
+        court_id = str(booking.court_id)
+        template = slot_templates.template_cache.peek(court_id) or slot_templates.get_court_template(db, court_id)
+        if template is None:
+            raise _court_not_found(court_id)
+
+        for attempt in range(2):
+            booking_data = _booking_values(booking, user_id, template)
+
+            logger.debug(
+                "Calculations: price_per_hour=%s, duration_minutes=%s, number_of_players=%s, total_amount=%s",
+                booking_data['price_per_hour'], booking.duration_minutes,
+                booking_data['number_of_players'], booking_data['total_amount']
+            )
+
+            params = {
+                **booking_data,
+                "occupancy": occupancy.to_bits(occupancy.booking_mask(booking_data['start_time'], booking.duration_minutes)),
+                "free": occupancy.to_bits(occupancy.EMPTY),
+                "court_version": template.version,
+            }
+            try:
+                row = db.execute(text(CREATE_BOOKING_SQL), params).fetchone()
+            except IntegrityError as e:
+                db.rollback()
+                # booking_no_overlap exclusion constraint (migration 004) is the backstop
+                if getattr(e.orig, 'pgcode', None) == EXCLUSION_VIOLATION:
+                    raise SlotConflictError(_conflict_message(booking_data)) from e
+                raise
+
+            result = row._mapping
+            if not result['court_found']:
+                db.rollback()
+                raise _court_not_found(court_id)
+            if result['id'] is not None:
+                break
+            db.rollback()
+            if result['court_version'] == template.version or attempt:
+                raise SlotConflictError(_conflict_message(booking_data))
+            # Pricing rules changed since the template was cached
+            template = slot_templates.get_court_templates(db, {court_id: result['court_version']})[court_id]
 
-        # Adjust data types for MySQL compatibility
-        adjusted_booking_data = {
-            **booking_data,
-            'start_time': start_dt,  # Use the parsed start TIME object
-            'end_time': end_time,    # end_time is already TIME object
-            'booking_date': booking.booking_date,  # Ensure date format
-        }
+        db.commit()
 
-        print(f"[CRUD BOOKING] Creating booking with adjusted data: {adjusted_booking_data}")
+        db_booking = models.Booking(**{column: result[column] for column in BOOKING_COLUMNS})
+        logger.debug("Booking created with ID: %s, total_amount: %s", db_booking.id, db_booking.total_amount)
+        return db_booking
 
-        db_booking = models.Booking(**adjusted_booking_data)
-        db.add(db_booking)
+    except SlotConflictError as e:
+        logger.debug("Conflict: %s", e)
+        raise
+    except Exception as e:
+        logger.debug("Exception during booking creation: %s", e)
+        raise e
 
-        print("[CRUD BOOKING] Committing to database...")
-        db.commit()
+def create_bookings(db: Session, bookings: list[schemas.BookingCreate], user_id: str):
+    """Create several bookings in one transaction, all or nothing.
 
-        print(f"[CRUD BOOKING] Refreshing booking data for ID: {db_booking.id}")
-        db.refresh(db_booking)
+    Courts are validated with one query, every affected court-day is claimed
+    with one multi-row upsert (same locking as CREATE_BOOKING_SQL), and the
+    bookings are written with one multi-row INSERT ... RETURNING.
+    """
+    try:
+        court_ids = sorted({str(booking.court_id) for booking in bookings})
+        versions = {
+            str(court_id): updated_at for court_id, updated_at in db.execute(
+                text("SELECT id, updated_at FROM admin_courts WHERE id IN :court_ids AND is_active = true")
+                .bindparams(bindparam("court_ids", expanding=True)),
+                {"court_ids": court_ids}
+            )
+        }
+        missing = [court_id for court_id in court_ids if court_id not in versions]
+        if missing:
+            raise ValueError(f"Court {missing[0]} not found in admin_courts table")
+
+        templates = slot_templates.get_court_templates(db, versions)
+        rows = [_booking_values(booking, user_id, templates[str(booking.court_id)]) for booking in bookings]
+
+        # Merge the cells per court-day, rejecting overlaps inside the batch itself
+        claims = {}
+        for row in rows:
+            key = (row['court_id'], row['booking_date'])
+            mask = occupancy.booking_mask(row['start_time'], row['duration_minutes'])
+            if claims.get(key, occupancy.EMPTY) & mask:
+                raise SlotConflictError(f"Requested slots overlap each other: {_conflict_message(row)}")
+            claims[key] = claims.get(key, occupancy.EMPTY) | mask
+
+        # Sorted so concurrent batches lock court-day rows in the same order
+        ordered = sorted(claims.items())
+        values_sql = ", ".join(
+            f"(:court_id_{i}, :booking_date_{i}, CAST(:occupancy_{i} AS BIT(96)), 1, now())"
+            for i in range(len(ordered))
+        )
+        params = {"free": occupancy.to_bits(occupancy.EMPTY)}
+        for i, ((court_id, booking_date), mask) in enumerate(ordered):
+            params[f"court_id_{i}"] = court_id
+            params[f"booking_date_{i}"] = booking_date
+            params[f"occupancy_{i}"] = occupancy.to_bits(mask)
+
+        claimed = db.execute(
+            text(f"""
+                INSERT INTO court_day_availability (court_id, booking_date, occupancy, version, updated_at)
+                VALUES {values_sql}
+                ON CONFLICT (court_id, booking_date) DO UPDATE
+                SET occupancy = court_day_availability.occupancy | EXCLUDED.occupancy,
+                    version = court_day_availability.version + 1,
+                    updated_at = now()
+                WHERE (court_day_availability.occupancy & EXCLUDED.occupancy) = CAST(:free AS BIT(96))
+                RETURNING court_id, booking_date
+            """),
+            params
+        ).fetchall()
+        claimed_keys = {(str(court_id), booking_date) for court_id, booking_date in claimed}
+        if len(claimed_keys) != len(ordered):
+            db.rollback()
+            conflict = next(row for row in rows if (row['court_id'], row['booking_date']) not in claimed_keys)
+            raise SlotConflictError(_conflict_message(conflict))
+
+        try:
+            db_bookings = db.scalars(insert(models.Booking).returning(models.Booking), rows).all()
+        except IntegrityError as e:
+            db.rollback()
+            # booking_no_overlap (migration 004) is checked as each row is inserted
+            if getattr(e.orig, 'pgcode', None) == EXCLUSION_VIOLATION:
+                raise SlotConflictError("One of the requested slots is already booked") from e
+            raise
 
-        print(f"[CRUD BOOKING] SUCCESS: Booking created with ID: {db_booking.id}, total_amount: {db_booking.total_amount}")
-        return db_booking
+        db.commit()
+
+        logger.debug("Created %d bookings in one transaction for user %s", len(db_bookings), user_id)
+        return db_bookings
 
+    except SlotConflictError as e:
+        logger.debug("Conflict: %s", e)
+        raise
     except Exception as e:
-        print(f"[CRUD BOOKING] ERROR: Exception during booking creation: {e}")
-        import traceback
-        traceback.print_exc()
+        db.rollback()
+        logger.debug("Exception during batch booking creation: %s", e)
         raise e
 
 def create_otp_record(db: Session, phone_number: str, otp_code: str, expires_at: datetime):
@@ -228,8 +401,159 @@ def verify_otp_record(db: Session, phone_number: str, otp_code: str):
     db.refresh(otp)
     return otp
 
-def get_bookings(db: Session, user_id: str):
-    return db.query(models.Booking).filter(models.Booking.user_id == user_id).all()
+def get_court_day_masks(db: Session, court_ids: list[str], date_from: date, date_to: date):
+    """Occupancy masks from court_day_availability, keyed by (court_id, booking_date).
+
+    Each mask is the OR of the day's non-cancelled bookings' cells (see
+    `occupancy`); the booking trigger (migration 008) keeps it current when
+    bookings are cancelled or changed. Days without a row are simply absent.
+    """
+    if not court_ids:
+        return {}
+    rows = db.query(
+        models.CourtDayAvailability.court_id,
+        models.CourtDayAvailability.booking_date,
+        models.CourtDayAvailability.occupancy,
+    ).filter(
+        models.CourtDayAvailability.court_id.in_(court_ids),
+        models.CourtDayAvailability.booking_date >= date_from,
+        models.CourtDayAvailability.booking_date <= date_to,
+    ).all()
+    return {
+        (str(court_id), booking_date): occupancy.from_bits(bits)
+        for court_id, booking_date, bits in rows
+    }
+
+def get_court_day_state(db: Session, court_id: str, booking_date: date):
+    """Court version, day occupancy and day version in one primary-key lookup.
+
+    Returns (updated_at, mask, day_version) for an active court, or None if
+    it does not exist. Days without bookings have mask 0 and version 0.
+    """
+    row = db.execute(
+        text("""
+            SELECT ac.updated_at, cda.occupancy, cda.version
+            FROM admin_courts ac
+            LEFT JOIN court_day_availability cda
+                ON cda.court_id = ac.id AND cda.booking_date = :booking_date
+            WHERE ac.id = :court_id AND ac.is_active = true
+        """),
+        {"court_id": court_id, "booking_date": booking_date}
+    ).fetchone()
+    if not row:
+        return None
+    return row[0], occupancy.from_bits(row[1]), row[2] or 0
+
+def _with_court_summary(row):
+    booking = row[0]
+    summary = row._mapping
+    booking.court = None if summary['summary_court_id'] is None else {
+        "court_id": str(summary['summary_court_id']),
+        "court_name": summary['court_name'],
+        "branch_id": str(summary['branch_id']) if summary['branch_id'] else None,
+        "branch_name": summary['branch_name'],
+        "location": summary['location'],
+        "city": summary['city'],
+        "game_type": summary['game_type'],
+    }
+    return booking
+
+BOOKING_PAGE_SIZE = 50
+MAX_BOOKING_PAGE_SIZE = 100
+
+def encode_booking_cursor(booking) -> str:
+    """Opaque cursor pointing just after `booking` in (date, start_time, id) order."""
+    raw = f"{booking.booking_date.isoformat()}|{booking.start_time.isoformat()}|{booking.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_booking_cursor(cursor: str) -> tuple:
+    """Inverse of `encode_booking_cursor`; raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        booking_date, start_time, booking_id = raw.split("|")
+        return date.fromisoformat(booking_date), time.fromisoformat(start_time), str(uuid.UUID(booking_id))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+# Not mapped as a model; only the columns the booking court summary needs
+_admin_branches = table(
+    "admin_branches",
+    column("id"), column("name"), column("address_line1"), column("city_id"),
+)
+
+def get_bookings(
+    db: Session,
+    user_id: str,
+    limit: int | None = None,
+    cursor: str | None = None,
+    when: str | None = None,
+    status: str | None = None,
+    with_court: bool = False,
+):
+    """One page of a user's bookings, keyset-paginated on (booking_date, start_time, id).
+
+    `when="upcoming"` returns bookings that have not started yet, soonest
+    first; otherwise bookings are newest first and `when="past"` keeps only
+    those that have started. Returns (bookings, next_cursor); next_cursor is
+    None on the last page. Every page is an index range scan on
+    ix_booking_user_date, however many bookings the user has.
+
+    With `with_court`, the court, branch, city and game type are joined into
+    the same query and each booking gets a `court` summary dict (None if the
+    court has been deleted).
+    """
+    limit = limit or BOOKING_PAGE_SIZE
+    key = tuple_(models.Booking.booking_date, models.Booking.start_time, models.Booking.id)
+
+    if with_court:
+        query = (
+            db.query(
+                models.Booking,
+                models.AdminCourt.id.label("summary_court_id"),
+                models.AdminCourt.name.label("court_name"),
+                _admin_branches.c.id.label("branch_id"),
+                _admin_branches.c.name.label("branch_name"),
+                _admin_branches.c.address_line1.label("location"),
+                models.AdminCity.name.label("city"),
+                models.AdminGameType.name.label("game_type"),
+            )
+            .outerjoin(models.AdminCourt, models.AdminCourt.id == models.Booking.court_id)
+            .outerjoin(_admin_branches, _admin_branches.c.id == models.AdminCourt.branch_id)
+            .outerjoin(models.AdminCity, models.AdminCity.id == _admin_branches.c.city_id)
+            .outerjoin(models.AdminGameType, models.AdminGameType.id == models.AdminCourt.game_type_id)
+        )
+    else:
+        query = db.query(models.Booking)
+    query = query.filter(models.Booking.user_id == user_id)
+    if status:
+        query = query.filter(models.Booking.status == status)
+
+    now = venue_time.now()
+    started = tuple_(models.Booking.booking_date, models.Booking.start_time) < tuple_(
+        literal(now.date()), literal(now.time().replace(microsecond=0))
+    )
+    if when == "upcoming":
+        query = query.filter(~started)
+    elif when == "past":
+        query = query.filter(started)
+
+    ascending = when == "upcoming"
+    if cursor:
+        after = tuple_(*(
+            literal(value, column.type) for value, column in zip(decode_booking_cursor(cursor), key.clauses)
+        ))
+        query = query.filter(key > after if ascending else key < after)
+
+    order = [column.asc() if ascending else column.desc() for column in key.clauses]
+    bookings = query.order_by(*order).limit(limit + 1).all()
+    if with_court:
+        bookings = [_with_court_summary(row) for row in bookings]
+
+    next_cursor = None
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        next_cursor = encode_booking_cursor(bookings[-1])
+    return bookings, next_cursor
 
 def get_cities(db: Session):
     return db.query(models.AdminCity).filter(models.AdminCity.is_active == True).all()
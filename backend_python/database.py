@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -32,20 +33,22 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
 def get_db():
     db = None
     try:
         db = SessionLocal()
         yield db
     except Exception as e:
-        print(f"[DB] Error creating database session: {e}")
+        logger.debug("Request failed with an open database session: %s", e)
         raise
     finally:
         if db:
             try:
                 db.close()
             except Exception as e:
-                print(f"[DB] Error closing database session: {e}")
+                logger.warning("Error closing database session: %s", e)
 
 def is_db_available():
     """Check if database is available (for dev mode fallback)"""
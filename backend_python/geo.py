@@ -0,0 +1,83 @@
+"""
+Great-circle distances and a grid index for "near me" court searches.
+
+Branches are bucketed into fixed GRID_CELL_DEGREES x GRID_CELL_DEGREES
+latitude/longitude cells. A radius query only looks at the cells that overlap
+the radius' bounding box, so its cost depends on how many branches are close
+by rather than on the size of the catalog.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+GRID_CELL_DEGREES = 0.1  # about 11 km north-south
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing every point within `radius_km`.
+
+    Near the poles, or when the box would cross the antimeridian, the full
+    longitude range is returned.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    min_lat = lat - math.degrees(angular)
+    max_lat = lat + math.degrees(angular)
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    delta_lon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+    min_lon, max_lon = lon - delta_lon, lon + delta_lon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
+
+
+class GeoGrid:
+    """Items at fixed coordinates, bucketed by grid cell."""
+
+    def __init__(self, points, cell_degrees: float = GRID_CELL_DEGREES):
+        """`points` yields (latitude, longitude, item)."""
+        self.cell_degrees = cell_degrees
+        self._cells = {}  # (lat cell, lon cell) -> [(lat, lon, item)]
+        for lat, lon, item in points:
+            self._cells.setdefault(self._cell(lat, lon), []).append((lat, lon, item))
+
+    def __len__(self) -> int:
+        return sum(len(points) for points in self._cells.values())
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> list[tuple[float, object]]:
+        """(distance_km, item) for every item within `radius_km`, nearest first."""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        low_lat, low_lon = self._cell(min_lat, min_lon)
+        high_lat, high_lon = self._cell(max_lat, max_lon)
+
+        if (high_lat - low_lat + 1) * (high_lon - low_lon + 1) > len(self._cells):
+            # A huge box: walking the occupied cells is cheaper
+            buckets = self._cells.values()
+        else:
+            buckets = [
+                self._cells[cell]
+                for cell in (
+                    (lat_cell, lon_cell)
+                    for lat_cell in range(low_lat, high_lat + 1)
+                    for lon_cell in range(low_lon, high_lon + 1)
+                )
+                if cell in self._cells
+            ]
+
+        hits = []
+        for bucket in buckets:
+            for point_lat, point_lon, item in bucket:
+                distance = haversine_km(lat, lon, point_lat, point_lon)
+                if distance <= radius_km:
+                    hits.append((distance, item))
+        hits.sort(key=lambda hit: hit[0])
+        return hits
@@ -0,0 +1,73 @@
+"""
+Idempotency-Key support for write endpoints.
+
+The first request with a given key (per user) runs normally and its response
+is remembered for IDEMPOTENCY_TTL_SECONDS. Retries with the same key and the
+same payload get that response replayed without touching the database; a
+retry that arrives while the first request is still running gets a 409.
+"""
+import hashlib
+import os
+from ttl_store import TTLStore
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 60 * 60)))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "50000"))
+MAX_KEY_LENGTH = 255
+
+# Pending requests release their key if they never complete
+PENDING_TTL_SECONDS = 60
+
+
+class IdempotencyError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class StoredResponse:
+    __slots__ = ("fingerprint", "status_code", "body")
+
+    def __init__(self, fingerprint: str, status_code: int | None = None, body=None):
+        self.fingerprint = fingerprint
+        self.status_code = status_code  # None while the first request is in flight
+        self.body = body
+
+
+def fingerprint(payload: str) -> str:
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, maxsize: int = IDEMPOTENCY_MAX_KEYS):
+        self._store = TTLStore(ttl=ttl, maxsize=maxsize)
+
+    def begin(self, scope: str, key: str, request_fingerprint: str) -> StoredResponse | None:
+        """Claim `key` for a new request, or return the response to replay.
+
+        Raises IdempotencyError if the key is in flight or was used for a
+        different payload.
+        """
+        if len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyError(400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+
+        claimed, stored = self._store.add(
+            (scope, key), StoredResponse(request_fingerprint), ttl=PENDING_TTL_SECONDS
+        )
+        if claimed:
+            return None
+        if stored.fingerprint != request_fingerprint:
+            raise IdempotencyError(422, "Idempotency-Key was already used with a different request")
+        if stored.status_code is None:
+            raise IdempotencyError(409, "A request with this Idempotency-Key is still being processed")
+        return stored
+
+    def complete(self, scope: str, key: str, request_fingerprint: str, status_code: int, body) -> None:
+        self._store.set((scope, key), StoredResponse(request_fingerprint, status_code, body))
+
+    def abandon(self, scope: str, key: str) -> None:
+        """Forget a key whose request failed in a way worth retrying."""
+        self._store.pop((scope, key))
+
+
+booking_keys = IdempotencyStore()
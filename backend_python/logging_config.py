@@ -0,0 +1,128 @@
+"""
+Application logging: levels, per-module loggers and off-thread output.
+
+Modules log through `logging.getLogger(__name__)`. Records are put on a queue
+by the request thread and formatted and written by a QueueListener thread, so
+a slow stdout never holds up a request. The default (LOG_LEVEL=INFO) is one
+structured access line per request plus warnings and errors; LOG_LEVEL=DEBUG
+adds the detailed lines, of which hot-path ones can be sampled.
+
+Environment:
+    LOG_LEVEL         DEBUG, INFO, WARNING, ... (default INFO)
+    LOG_FORMAT        json or text (default json)
+    LOG_SAMPLE_RATE   share of sampled debug lines kept, 0..1 (default 0.01)
+"""
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+
+# Logged records get these attributes by default; anything else came from `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName", "sampled"}
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only `rate` of the records logged with `extra=SAMPLED`."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        return random.random() < self.rate
+
+
+# Pass as `extra=SAMPLED` on hot-path debug lines
+SAMPLED = {"sampled": True}
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue records with their message and traceback rendered but unformatted.
+
+    The stock handler bakes the traceback into the message text, which
+    would leave JsonFormatter nothing to put in its `exc` field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """Route all logging through a queue to a background writer thread.
+
+    Safe to call more than once; later calls are no-ops.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        output.setFormatter(JsonFormatter())
+
+    records = queue.SimpleQueue()
+    queue_handler = _QueueHandler(records)
+    # Sampling happens before the record is queued so dropped lines cost nothing more
+    queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    # uvicorn's own access log would duplicate the request line written by main.py
+    logging.getLogger("uvicorn.access").disabled = True
+    for name in ("uvicorn", "uvicorn.error"):
+        logging.getLogger(name).handlers[:] = []
+        logging.getLogger(name).propagate = True
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
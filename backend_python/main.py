@@ -4,8 +4,17 @@ from routers import auth, profile, bookings, venues, courts, coupons
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from database import SQLALCHEMY_DATABASE_URL
+from fastapi.datastructures import Default
 from fastapi.responses import JSONResponse
-import traceback
+import logging
+import time
+from logging_config import setup_logging, shutdown_logging
+from compression import CompressionMiddleware
+from serialization import OrjsonResponse
+
+setup_logging()
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger("myrush.access")
 
 # Lifespan event to create tables on startup
 @asynccontextmanager
@@ -19,18 +28,20 @@ async def lifespan(app: FastAPI):
         else:
             db_type = "MySQL"
             
-        print(f"[DB] Connecting to database: {db_type}")
+        logger.info("Connecting to database: %s", db_type)
         
         # Base.metadata.create_all(bind=engine)
-        print("[DB] Database tables created successfully")
+        logger.info("Database tables created successfully")
     except Exception as e:
-        print(f"[DB WARN] Database connection failed: {e}")
-        print("[DB WARN] Server starting but database connection failed. Check your .env configuration.")
+        logger.warning("Database connection failed: %s", e)
+        logger.warning("Server starting but database connection failed. Check your .env configuration.")
     yield
     # Shutdown
-    pass
+    shutdown_logging()
 
-app = FastAPI(lifespan=lifespan, debug=True)
+# Wrapped in Default() so routes with a response_model keep FastAPI's own
+# direct-to-JSON serialization; everything else renders with orjson.
+app = FastAPI(lifespan=lifespan, debug=True, default_response_class=Default(OrjsonResponse))
 
 # CORS Configuration
 origins = ["*"]
@@ -41,13 +52,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor-paginated lists return the next page's cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
+# gzip/brotli for bodies over COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+# One structured access line per request
+@app.middleware("http")
+async def log_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        access_logger.info(
+            "%s %s %s", request.method, request.url.path, status_code,
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "client": request.client.host if request.client else None,
+            },
+        )
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    print(f"[ERROR] Global exception handler: {type(exc).__name__}: {str(exc)}", flush=True)
-    traceback.print_exc()
+    logger.error("Unhandled %s on %s %s", type(exc).__name__, request.method, request.url.path, exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={"detail": f"Internal server error: {str(exc)}", "type": type(exc).__name__}
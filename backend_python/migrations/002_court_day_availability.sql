@@ -0,0 +1,34 @@
+-- Migration: write-through occupancy per court and day (PostgreSQL)
+-- Each row holds the OR of every non-cancelled booking's cells for that day.
+-- Cell i covers minutes [i*15, i*15+15) and is character i+1 of the bit string
+-- (see occupancy.py).
+
+CREATE TABLE IF NOT EXISTS court_day_availability (
+    court_id UUID NOT NULL,
+    booking_date DATE NOT NULL,
+    occupancy BIT(96) NOT NULL DEFAULT repeat('0', 96)::bit(96),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (court_id, booking_date)
+);
+
+-- Backfill from existing bookings
+INSERT INTO court_day_availability (court_id, booking_date, occupancy)
+SELECT court_id, booking_date, bit_or(cells)
+FROM (
+    SELECT
+        court_id,
+        booking_date,
+        (repeat('0', first_cell) || repeat('1', end_cell - first_cell) || repeat('0', 96 - end_cell))::bit(96) AS cells
+    FROM (
+        SELECT
+            court_id,
+            booking_date,
+            EXTRACT(EPOCH FROM start_time)::int / 900 AS first_cell,
+            LEAST(96, CEIL((EXTRACT(EPOCH FROM start_time) + duration_minutes * 60) / 900.0))::int AS end_cell
+        FROM booking
+        WHERE status != 'cancelled'
+    ) spans
+    WHERE end_cell > first_cell
+) masks
+GROUP BY court_id, booking_date
+ON CONFLICT (court_id, booking_date) DO UPDATE SET occupancy = EXCLUDED.occupancy;
@@ -0,0 +1,9 @@
+-- Migration: per court-day version counter (PostgreSQL)
+-- Bumped on every write to court_day_availability; combined with
+-- admin_courts.updated_at it forms the ETag of /courts/{id}/available-slots.
+
+ALTER TABLE court_day_availability
+    ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
+
+-- Existing rows already reflect at least one booking
+UPDATE court_day_availability SET version = 1 WHERE version = 0;
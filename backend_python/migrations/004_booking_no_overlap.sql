@@ -0,0 +1,26 @@
+-- Migration: database-enforced booking exclusivity (PostgreSQL)
+-- crud.create_booking already serializes bookings per court-day through the
+-- court_day_availability row lock; this exclusion constraint is the backstop
+-- for any writer that bypasses it. Requires the btree_gist extension
+-- (available on Supabase).
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+-- Existing double bookings must be resolved before the constraint can be added:
+--   SELECT a.id, b.id, a.court_id, a.booking_date, a.start_time, b.start_time
+--   FROM booking a
+--   JOIN booking b ON a.court_id = b.court_id AND a.booking_date = b.booking_date AND a.id < b.id
+--   WHERE a.status != 'cancelled' AND b.status != 'cancelled'
+--     AND a.booking_date + a.start_time < b.booking_date + b.start_time + b.duration_minutes * interval '1 minute'
+--     AND b.booking_date + b.start_time < a.booking_date + a.start_time + a.duration_minutes * interval '1 minute';
+
+ALTER TABLE booking
+    ADD CONSTRAINT booking_no_overlap
+    EXCLUDE USING gist (
+        court_id WITH =,
+        tsrange(
+            booking_date + start_time,
+            booking_date + start_time + duration_minutes * interval '1 minute'
+        ) WITH &&
+    )
+    WHERE (status != 'cancelled');
@@ -0,0 +1,7 @@
+-- Migration: index for keyset-paginated GET /bookings/ (PostgreSQL)
+-- Pages are read as a range on (user_id, booking_date, start_time, id) in
+-- either direction, so each page is an index range scan regardless of how
+-- many bookings the user has.
+
+CREATE INDEX IF NOT EXISTS ix_booking_user_date
+    ON booking (user_id, booking_date, start_time, id);
@@ -0,0 +1,15 @@
+-- Migration: indexes for the parameterized court listing queries (PostgreSQL)
+-- court_queries.py filters on ids and LOWER(city name) with equality
+-- predicates, which these indexes can serve.
+
+CREATE INDEX IF NOT EXISTS ix_admin_courts_game_type_active
+    ON admin_courts (game_type_id) WHERE is_active = true;
+
+CREATE INDEX IF NOT EXISTS ix_admin_courts_branch_active
+    ON admin_courts (branch_id) WHERE is_active = true;
+
+CREATE INDEX IF NOT EXISTS ix_admin_branches_city
+    ON admin_branches (city_id);
+
+CREATE INDEX IF NOT EXISTS ix_admin_cities_lower_name
+    ON admin_cities (LOWER(name));
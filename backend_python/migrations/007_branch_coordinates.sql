@@ -0,0 +1,16 @@
+-- Migration: branch coordinates for GET /courts/nearby (PostgreSQL)
+-- The catalog builds its spatial index from these columns; branches without
+-- coordinates are simply left out of proximity searches. The index serves
+-- the bounding-box query used when the catalog is disabled.
+
+ALTER TABLE admin_branches ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE admin_branches ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+
+ALTER TABLE admin_branches DROP CONSTRAINT IF EXISTS admin_branches_coordinates_check;
+ALTER TABLE admin_branches ADD CONSTRAINT admin_branches_coordinates_check CHECK (
+    (latitude IS NULL AND longitude IS NULL)
+    OR (latitude BETWEEN -90 AND 90 AND longitude BETWEEN -180 AND 180)
+);
+
+CREATE INDEX IF NOT EXISTS ix_admin_branches_coordinates
+    ON admin_branches (latitude, longitude) WHERE latitude IS NOT NULL;
@@ -0,0 +1,72 @@
+-- Migration: keep court_day_availability in step with booking (PostgreSQL)
+-- The booking endpoints claim cells before inserting, but bookings are also
+-- cancelled, moved and deleted outside this API (e.g. the admin panel), and
+-- a cell can never just be cleared because another booking may share it.
+-- This trigger recomputes every court-day a booking row enters or leaves
+-- from that day's non-cancelled bookings. Needs the version column (003).
+
+-- The row is locked before the bookings are read: under READ COMMITTED each
+-- statement takes a new snapshot, so the UPDATE below sees any booking whose
+-- claim held the lock first. Reading them in the locking statement itself
+-- would use the snapshot taken before the wait and lose those cells.
+CREATE OR REPLACE FUNCTION recompute_court_day_availability(p_court_id UUID, p_booking_date DATE)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO court_day_availability (court_id, booking_date, occupancy, version, updated_at)
+    VALUES (p_court_id, p_booking_date, repeat('0', 96)::bit(96), 0, now())
+    ON CONFLICT (court_id, booking_date) DO NOTHING;
+
+    PERFORM 1 FROM court_day_availability
+    WHERE court_id = p_court_id AND booking_date = p_booking_date
+    FOR UPDATE;
+
+    UPDATE court_day_availability
+    SET occupancy = (
+            SELECT COALESCE(bit_or(cells), repeat('0', 96)::bit(96))
+            FROM (
+                SELECT (repeat('0', first_cell) || repeat('1', end_cell - first_cell) || repeat('0', 96 - end_cell))::bit(96) AS cells
+                FROM (
+                    SELECT
+                        EXTRACT(EPOCH FROM start_time)::int / 900 AS first_cell,
+                        LEAST(96, CEIL((EXTRACT(EPOCH FROM start_time) + duration_minutes * 60) / 900.0))::int AS end_cell
+                    FROM booking
+                    WHERE court_id::uuid = p_court_id
+                      AND booking_date = p_booking_date
+                      AND status != 'cancelled'
+                ) spans
+                WHERE end_cell > first_cell
+            ) masks
+        ),
+        version = version + 1,
+        updated_at = now()
+    WHERE court_id = p_court_id AND booking_date = p_booking_date;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION booking_court_day_availability()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM recompute_court_day_availability(OLD.court_id::uuid, OLD.booking_date);
+    END IF;
+    IF TG_OP = 'INSERT'
+       OR (TG_OP = 'UPDATE' AND (NEW.court_id, NEW.booking_date) IS DISTINCT FROM (OLD.court_id, OLD.booking_date)) THEN
+        PERFORM recompute_court_day_availability(NEW.court_id::uuid, NEW.booking_date);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS booking_court_day_availability ON booking;
+CREATE TRIGGER booking_court_day_availability
+    AFTER INSERT OR UPDATE OF status, court_id, booking_date, start_time, duration_minutes OR DELETE
+    ON booking
+    FOR EACH ROW
+    EXECUTE FUNCTION booking_court_day_availability();
+
+-- Drop cells left behind by bookings cancelled before this trigger existed
+SELECT recompute_court_day_availability(court_id, booking_date) FROM court_day_availability;
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Date, Time, DECIMAL, ForeignKey, Text, JSON
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, BIT
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -133,3 +133,17 @@ class AdminCourt(Base):
     is_active = Column(Boolean, nullable=True, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class CourtDayAvailability(Base):
+    """Write-through occupancy of a court on one day (see occupancy.py).
+
+    Maintained by crud.create_booking in the same transaction as the booking
+    insert, so availability reads never have to scan the booking table.
+    """
+    __tablename__ = "court_day_availability"
+
+    court_id = Column(UUID(as_uuid=False), primary_key=True)
+    booking_date = Column(Date, primary_key=True)
+    occupancy = Column(BIT(96), nullable=False)  # character i = 15-minute cell i
+    version = Column(Integer, nullable=False, default=0)  # bumped on every write, feeds the slots ETag
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
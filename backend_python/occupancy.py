@@ -0,0 +1,85 @@
+"""
+Fixed-width per-day occupancy bitmaps.
+
+A day is divided into CELLS_PER_DAY cells of CELL_MINUTES each. Bit `i` of a
+mask is set when cell `i` (starting at minute `i * CELL_MINUTES`) is covered,
+so slot rules, admin unavailability and bookings of any length can all be
+compared with plain integer bit operations.
+"""
+from datetime import time
+
+CELL_MINUTES = 15
+MINUTES_PER_DAY = 24 * 60
+CELLS_PER_DAY = MINUTES_PER_DAY // CELL_MINUTES  # 96
+EMPTY = 0
+FULL_DAY = (1 << CELLS_PER_DAY) - 1
+
+
+def parse_minutes(value) -> int | None:
+    """Minutes since midnight for "HH:MM" strings or `time` objects.
+
+    "24:00" is accepted as the end of the day. Returns None for anything
+    that cannot be parsed.
+    """
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    if not isinstance(value, str):
+        return None
+    try:
+        hours, minutes = value.strip().split(':')[:2]
+        total = int(hours) * 60 + int(minutes)
+    except ValueError:
+        return None
+    if not 0 <= total <= MINUTES_PER_DAY or not 0 <= int(minutes) < 60:
+        return None
+    return total
+
+
+def span_mask(start_minute: int, end_minute: int) -> int:
+    """Mask of every cell overlapped by [start_minute, end_minute), clamped to the day."""
+    start_minute = max(0, start_minute)
+    end_minute = min(MINUTES_PER_DAY, end_minute)
+    if end_minute <= start_minute:
+        return EMPTY
+    first_cell = start_minute // CELL_MINUTES
+    end_cell = -(-end_minute // CELL_MINUTES)  # ceil
+    return ((1 << (end_cell - first_cell)) - 1) << first_cell
+
+
+def booking_mask(start_time, duration_minutes: int) -> int:
+    """Cells blocked by a booking; anything past midnight is clipped."""
+    start_minute = parse_minutes(start_time)
+    if start_minute is None:
+        return EMPTY
+    return span_mask(start_minute, start_minute + int(duration_minutes or 0))
+
+
+def format_minutes(minute: int) -> str:
+    """24-hour "HH:MM" for a minute offset; 1440 wraps to "00:00"."""
+    minute %= MINUTES_PER_DAY
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def format_display(minute: int) -> str:
+    """12-hour "HH:MM AM" label for a minute offset."""
+    minute %= MINUTES_PER_DAY
+    hour = minute // 60
+    period = "AM" if hour < 12 else "PM"
+    display_hour = hour
+    if display_hour > 12:
+        display_hour -= 12
+    if display_hour == 0:
+        display_hour = 12
+    return f"{display_hour:02d}:{minute % 60:02d} {period}"
+
+
+def to_bits(mask: int) -> str:
+    """Postgres BIT(96) literal for a mask; character i is cell i."""
+    return format(mask & FULL_DAY, f"0{CELLS_PER_DAY}b")[::-1]
+
+
+def from_bits(bits) -> int:
+    """Inverse of `to_bits`; NULL (no row) means an empty day."""
+    if not bits:
+        return EMPTY
+    return int(str(bits)[::-1], 2)
@@ -1,3 +1,4 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
@@ -10,6 +11,8 @@ from datetime import timedelta, datetime
 import uuid
 import random
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/auth",
     tags=["auth"]
@@ -59,7 +62,7 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Se
 
 @router.post("/send-otp", response_model=schemas.SendOTPResponse)
 def send_otp(payload: schemas.SendOTPRequest):
-    print(f"[SEND-OTP] Request for {payload.phone_number}", flush=True)
+    logger.debug("Send OTP request for %s", payload.phone_number)
     
     # Use dummy OTP for development
     otp_code = "12345"
@@ -68,16 +71,15 @@ def send_otp(payload: schemas.SendOTPRequest):
     # Try to store in database, but don't fail if DB is down
     try:
         db = database.SessionLocal()
-        print(f"[SEND-OTP] Creating OTP record in database...", flush=True)
+        logger.debug("Creating OTP record in database...")
         otp = crud.create_otp_record(db, payload.phone_number, otp_code, expires_at)
         db.close()
-        print(f"[DEV] OTP for {payload.phone_number}: {otp_code} (id={otp.id})", flush=True)
+        logger.debug("[DEV] OTP for %s: %s (id=%s)", payload.phone_number, otp_code, otp.id)
         return {"message": "OTP sent successfully", "success": True, "verification_id": str(otp.id), "otp_code": otp_code}
     except Exception as db_err:
         # Database error - provide response anyway with dev OTP
-        print(f"[SEND-OTP] DB Error: {type(db_err).__name__}: {str(db_err)}", flush=True)
-        print(f"[SEND-OTP] Continuing in dev mode without database...", flush=True)
-        print(f"[DEV] OTP for {payload.phone_number}: {otp_code} (dev mode, no db)", flush=True)
+        logger.warning("Send OTP database error, continuing in dev mode: %s: %s", type(db_err).__name__, db_err)
+        logger.debug("[DEV] OTP for %s: %s (dev mode, no db)", payload.phone_number, otp_code)
         # Return success response even without DB - this allows development to continue
         return {"message": "OTP sent successfully (dev mode - DB unavailable)", "success": True, "verification_id": "dev-mode", "otp_code": otp_code}
 
@@ -90,7 +92,7 @@ def verify_otp(payload: schemas.VerifyOTPRequest):
     fixed OTP "12345" is always accepted, even if the database is down.
     """
     try:
-        print(f"[VERIFY-OTP] Request: phone={payload.phone_number}, otp={payload.otp_code}")
+        logger.debug("Verify OTP request: phone=%s", payload.phone_number)
         db = database.SessionLocal()
 
         try:
@@ -116,37 +118,37 @@ def verify_otp(payload: schemas.VerifyOTPRequest):
                 else:
                     otp = crud.verify_otp_record(db, payload.phone_number, payload.otp_code)
             except Exception as db_err:
-                print(f"[VERIFY-OTP] Database error when verifying OTP: {db_err}")
+                logger.warning("Database error when verifying OTP: %s", db_err)
                 # In dev mode, still accept the fixed OTP even if DB is down
                 if payload.otp_code == "12345":
-                    print("[VERIFY-OTP] Accepting dev OTP despite DB error")
+                    logger.warning("Accepting dev OTP despite DB error")
                     otp = True
                 else:
                     raise
 
             if not otp:
-                print("[VERIFY-OTP] Invalid OTP")
+                logger.debug("Invalid OTP")
                 raise HTTPException(status_code=400, detail="Invalid or expired OTP")
 
-            print("[VERIFY-OTP] OTP verified, checking for existing user...")
+            logger.debug("OTP verified, checking for existing user...")
 
             try:
                 user = crud.get_user_by_phone(db, payload.phone_number)
                 is_new_user = False
             except Exception as db_err:
-                print(f"[VERIFY-OTP] Database error checking user: {db_err}")
+                logger.warning("Database error checking user: %s", db_err)
                 user = None
                 is_new_user = True
 
             if user is None:
                 is_new_user = True
 
-            print(f"[VERIFY-OTP] User found: {user is not None}, is_new_user: {is_new_user}")
+            logger.debug("User found: %s, is_new_user: %s", user is not None, is_new_user)
 
             # If new user and no profile data, ask frontend to show profile form
             has_profile_data = payload.full_name is not None
             if is_new_user and not has_profile_data:
-                print("[VERIFY-OTP] New user needs to complete profile")
+                logger.debug("New user needs to complete profile")
                 db.close()
                 return {
                     "needs_profile": True,
@@ -166,20 +168,20 @@ def verify_otp(payload: schemas.VerifyOTPRequest):
                 "playing_style": payload.playing_style,
             }
             profile_payload = {k: v for k, v in profile_payload.items() if v is not None}
-            print(f"[VERIFY-OTP] Profile payload: {profile_payload}")
+            logger.debug("Profile payload: %s", profile_payload)
 
             # Create or update user + profile
             try:
                 if not user:
-                    print("[VERIFY-OTP] Creating new user...")
+                    logger.debug("Creating new user...")
                     user = crud.create_user_with_phone(
                         db,
                         payload.phone_number,
                         profile_payload if profile_payload else None,
                     )
-                    print(f"[VERIFY-OTP] User created: {user.id}")
+                    logger.debug("User created: %s", user.id)
                 else:
-                    print(f"[VERIFY-OTP] Updating existing user: {user.id}")
+                    logger.debug("Updating existing user: %s", user.id)
                     if profile_payload:
                         allowed_fields = [
                             "phone_number",
@@ -200,10 +202,10 @@ def verify_otp(payload: schemas.VerifyOTPRequest):
                             db, schemas.ProfileCreate(**profile_create_data), user.id
                         )
             except Exception as db_err:
-                print(f"[VERIFY-OTP] Database error creating/updating user: {db_err}")
+                logger.warning("Database error creating/updating user: %s", db_err)
                 # In dev mode with DB down, create a dummy user response
                 if not user:
-                    print("[VERIFY-OTP] Creating dummy user in dev mode")
+                    logger.warning("Creating dummy user in dev mode")
                     user = type("User", (), {
                         "id": str(uuid.uuid4()),
                         "email": f"{payload.phone_number}@phone.myrush.app",
@@ -220,11 +222,9 @@ def verify_otp(payload: schemas.VerifyOTPRequest):
                     detail="Cannot generate auth token: user has no email or id",
                 )
             sub_value = str(raw_sub)
-            print(
-                "[VERIFY-OTP] Generating token. "
-                f"email={getattr(user, 'email', None)}, "
-                f"id={getattr(user, 'id', None)}, "
-                f"sub={sub_value} (type={type(raw_sub)})",
+            logger.debug(
+                "Generating token. email=%s, id=%s, sub=%s (type=%s)",
+                getattr(user, 'email', None), getattr(user, 'id', None), sub_value, type(raw_sub)
             )
 
             access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -233,7 +233,7 @@ def verify_otp(payload: schemas.VerifyOTPRequest):
             )
 
             db.close()
-            print("[VERIFY-OTP] Success! Token generated")
+            logger.debug("Token generated")
             return {
                 "access_token": access_token,
                 "token_type": "bearer",
@@ -244,18 +244,14 @@ def verify_otp(payload: schemas.VerifyOTPRequest):
             raise
         except Exception as e:
             db.close()
-            print(f"[VERIFY-OTP] ERROR: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error verifying OTP")
             raise HTTPException(
                 status_code=500, detail=f"Internal server error: {e}"
             )
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[VERIFY-OTP] OUTER ERROR: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error verifying OTP")
         raise HTTPException(
             status_code=500, detail=f"Internal server error: {e}"
         )
@@ -1,41 +1,174 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
-from typing import Annotated, List
+from typing import Annotated, Callable, List, Literal, Optional
 import schemas, crud, models, database
+import idempotency
+import occupancy
+import slot_holds
 from routers.auth import get_current_user
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/bookings",
     tags=["bookings"],
 )
 
+IdempotencyKey = Annotated[Optional[str], Header(alias="Idempotency-Key")]
+
+_booking_adapter = TypeAdapter(schemas.BookingResponse)
+_booking_list_adapter = TypeAdapter(List[schemas.BookingResponse])
+
+
+def _idempotent(key: Optional[str], user_id, payload: BaseModel, adapter: TypeAdapter, create: Callable):
+    """Run `create()` at most once per (user, Idempotency-Key) and replay its response.
+
+    Successful responses and slot conflicts are remembered; other failures,
+    including conflicts with another user's hold (which clear once the hold
+    expires), release the key so the client can retry.
+    """
+    if not key:
+        return create()
+
+    scope = str(user_id)
+    request_fingerprint = idempotency.fingerprint(payload.model_dump_json())
+    try:
+        stored = idempotency.booking_keys.begin(scope, key, request_fingerprint)
+    except idempotency.IdempotencyError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    if stored is not None:
+        logger.debug("Replaying response for Idempotency-Key %s", key)
+        return JSONResponse(
+            status_code=stored.status_code,
+            content=stored.body,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    try:
+        result = create()
+    except HTTPException as e:
+        if e.status_code == 409 and not isinstance(e.__cause__, slot_holds.HoldConflictError):
+            idempotency.booking_keys.complete(scope, key, request_fingerprint, 409, {"detail": e.detail})
+        else:
+            idempotency.booking_keys.abandon(scope, key)
+        raise
+    except Exception:
+        idempotency.booking_keys.abandon(scope, key)
+        raise
+
+    body = adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json")
+    idempotency.booking_keys.complete(scope, key, request_fingerprint, 200, body)
+    return JSONResponse(content=body)
+
+
+def _take_holds(user_id, bookings: List[schemas.BookingCreate]) -> list:
+    """Consume the user's holds on the requested slots; fail if someone else holds them."""
+    taken = []
+    try:
+        for booking in bookings:
+            start_time = crud.parse_clock_time(booking.start_time)
+            if start_time is None:
+                continue  # crud rejects the booking itself
+            start_minute = occupancy.parse_minutes(start_time)
+            taken += slot_holds.holds.take_for_booking(
+                str(user_id),
+                str(booking.court_id),
+                booking.booking_date,
+                occupancy.span_mask(start_minute, start_minute + booking.duration_minutes),
+            )
+    except slot_holds.HoldConflictError:
+        slot_holds.holds.restore(taken)
+        raise
+    return taken
+
+
+@router.post("/holds", response_model=schemas.SlotHoldResponse)
+def create_hold(
+    hold_request: schemas.SlotHoldCreate,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    db: Session = Depends(database.get_db)
+):
+    """Reserve a slot for SLOT_HOLD_TTL_SECONDS while the user checks out."""
+    start_time = crud.parse_clock_time(hold_request.start_time)
+    if start_time is None:
+        raise HTTPException(status_code=400, detail="Invalid start_time")
+    start_minute = occupancy.parse_minutes(start_time)
+
+    state = crud.get_court_day_state(db, hold_request.court_id, hold_request.booking_date)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Court not found")
+    _, booked_mask, _ = state
+    if booked_mask & occupancy.span_mask(start_minute, start_minute + hold_request.duration_minutes):
+        raise HTTPException(status_code=409, detail="This slot is already booked")
+
+    try:
+        hold = slot_holds.holds.create(
+            str(current_user.id),
+            hold_request.court_id,
+            hold_request.booking_date,
+            start_minute,
+            hold_request.duration_minutes,
+        )
+    except slot_holds.HoldConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return schemas.SlotHoldResponse(
+        hold_id=hold.id,
+        court_id=hold.court_id,
+        booking_date=hold.booking_date,
+        start_time=start_time,
+        duration_minutes=hold.duration_minutes,
+        expires_at=hold.expires_at,
+    )
+
+@router.delete("/holds/{hold_id}", status_code=204)
+def release_hold(
+    hold_id: str,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+):
+    """Give a held slot back before its hold expires."""
+    if not slot_holds.holds.release(hold_id, str(current_user.id)):
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return Response(status_code=204)
+
 @router.post("/", response_model=schemas.BookingResponse)
 def create_booking(
     booking: schemas.BookingCreate,
     current_user: Annotated[models.User, Depends(get_current_user)],
+    idempotency_key: IdempotencyKey = None,
     db: Session = Depends(database.get_db)
 ):
+    return _idempotent(
+        idempotency_key, current_user.id, booking, _booking_adapter,
+        lambda: _create_booking(booking, current_user, db)
+    )
+
+def _create_booking(booking: schemas.BookingCreate, current_user: models.User, db: Session):
     try:
-        print("===========================================")
-        print(f"[BOOKINGS API] 🔥 RECEIVED CREATE BOOKING REQUEST")
-        print(f"[BOOKINGS API] User: {current_user.id}")
-        print(f"[BOOKINGS API] Booking data: court_id={booking.court_id}, date={booking.booking_date}, price_per_hour={booking.price_per_hour}, players={booking.number_of_players}")
-        print("===========================================")
+        logger.debug(
+            "Create booking: user=%s court_id=%s date=%s start=%s players=%s",
+            current_user.id, booking.court_id, booking.booking_date, booking.start_time, booking.number_of_players
+        )
 
-        result = crud.create_booking(db=db, booking=booking, user_id=current_user.id)
+        taken = _take_holds(current_user.id, [booking])
+        try:
+            result = crud.create_booking(db=db, booking=booking, user_id=current_user.id)
+        except Exception:
+            slot_holds.holds.restore(taken)
+            raise
 
-        print(f"[BOOKINGS API] ✅ BOOKING CREATED SUCCESSFULLY: ID={result.id}, Total=₹{result.total_amount}")
+        logger.debug("Booking created: id=%s total=%s", result.id, result.total_amount)
         return result
 
+    except (crud.SlotConflictError, slot_holds.HoldConflictError) as e:
+        logger.debug("Slot already booked: %s", e)
+        raise HTTPException(status_code=409, detail=str(e)) from e
     except Exception as e:
-        print("===========================================")
-        print(f"[BOOKINGS API] ❌ CRITICAL ERROR CREATING BOOKING")
-        print(f"[BOOKINGS API] Error: {e}")
-        print(f"[BOOKINGS API] Booking details: {booking.dict()}")
-        print(f"[BOOKINGS API] Current user: {current_user.id}")
-        import traceback
-        traceback.print_exc()
-        print("===========================================")
+        logger.exception("Error creating booking for user %s: %s", current_user.id, booking.model_dump())
 
         # Return specific error response instead of generic 500
         from fastapi import HTTPException
@@ -44,9 +177,66 @@ def create_booking(
             detail=f"Booking creation failed: {str(e)}"
         )
 
-@router.get("/", response_model=List[schemas.BookingResponse])
+@router.post("/batch", response_model=List[schemas.BookingResponse])
+def create_bookings(
+    batch: schemas.BookingBatchCreate,
+    current_user: Annotated[models.User, Depends(get_current_user)],
+    idempotency_key: IdempotencyKey = None,
+    db: Session = Depends(database.get_db)
+):
+    """Book several slots at once; either all of them are created or none."""
+    return _idempotent(
+        idempotency_key, current_user.id, batch, _booking_list_adapter,
+        lambda: _create_bookings(batch, current_user, db)
+    )
+
+def _create_bookings(batch: schemas.BookingBatchCreate, current_user: models.User, db: Session):
+    try:
+        logger.debug("Batch booking of %d slots for user %s", len(batch.bookings), current_user.id)
+        taken = _take_holds(current_user.id, batch.bookings)
+        try:
+            return crud.create_bookings(db=db, bookings=batch.bookings, user_id=current_user.id)
+        except Exception:
+            slot_holds.holds.restore(taken)
+            raise
+
+    except (crud.SlotConflictError, slot_holds.HoldConflictError) as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except Exception as e:
+        logger.exception("Error creating %d bookings for user %s", len(batch.bookings), current_user.id)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Booking creation failed: {str(e)}"
+        )
+
+@router.get("/", response_model=List[schemas.BookingListResponse])
 def get_bookings(
     current_user: Annotated[models.User, Depends(get_current_user)],
+    response: Response,
+    limit: int = Query(crud.BOOKING_PAGE_SIZE, ge=1, le=crud.MAX_BOOKING_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    when: Optional[Literal["upcoming", "past"]] = None,
+    status: Optional[str] = None,
+    include_court: bool = False,
     db: Session = Depends(database.get_db),
 ):
-    return crud.get_bookings(db=db, user_id=current_user.id)
+    """
+    The user's bookings, one page at a time.
+
+    `when=upcoming` lists bookings that have not started yet, soonest first;
+    otherwise the newest come first. When more bookings follow, the
+    `X-Next-Cursor` response header holds the `cursor` for the next page.
+    `include_court=true` embeds a court/branch summary in each booking,
+    fetched in the same query.
+    """
+    try:
+        bookings, next_cursor = crud.get_bookings(
+            db=db, user_id=current_user.id, limit=limit, cursor=cursor, when=when, status=status,
+            with_court=include_court
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return bookings
@@ -1,10 +1,13 @@
+import logging
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from database import get_db
 from schemas import CouponValidateRequest, CouponResponse
-from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel
+import coupon_cache
+
+logger = logging.getLogger(__name__)
 
 class AvailableCouponResponse(BaseModel):
     code: str
@@ -21,102 +24,28 @@ router = APIRouter()
 @router.post("/validate", response_model=CouponResponse)
 def validate_coupon(request: CouponValidateRequest, db: Session = Depends(get_db)):
     """
-    Validate a coupon code and calculate discount
+    Validate a coupon code and calculate discount.
+    Answered from the in-memory coupon table (see coupon_cache).
     """
-    from sqlalchemy import text
-
     try:
-        # Query to find the coupon
-        query = text("""
-            SELECT code, discount_type, discount_value, min_order_value, max_discount,
-                   start_date, end_date, is_active
-            FROM admin_coupons
-            WHERE code = :code AND is_active = true
-        """)
-
-        result = db.execute(query, {"code": request.coupon_code.upper()}).fetchone()
-
-        if not result:
-            return CouponResponse(
-                valid=False,
-                message="Invalid coupon code"
-            )
-
-        code, discount_type, discount_value, min_order_value, max_discount, start_date, end_date, is_active = result
-
-        # Check if coupon is within valid date range
-        now = datetime.utcnow()
-        if now < start_date or now > end_date:
-            return CouponResponse(
-                valid=False,
-                message="Coupon has expired or is not yet valid"
-            )
-
-        # Check minimum order value
-        if min_order_value and request.total_amount < float(min_order_value):
-            return CouponResponse(
-                valid=False,
-                message=f"Order value must be at least ₹{min_order_value} to use this coupon"
-            )
-
-        # Calculate discount based on type
-        if discount_type.lower() == 'percentage':
-            discount_amount = (request.total_amount * float(discount_value)) / 100
-            discount_percentage = float(discount_value)
-        else:  # fixed amount
-            discount_amount = float(discount_value)
-            discount_percentage = (discount_amount / request.total_amount) * 100
-
-        # Apply max discount limit if set
-        if max_discount and discount_amount > float(max_discount):
-            discount_amount = float(max_discount)
-
-        final_amount = request.total_amount - discount_amount
-
-        # Ensure final amount is not negative
-        final_amount = max(0, final_amount)
-
         return CouponResponse(
-            valid=True,
-            discount_percentage=round(discount_percentage, 2),
-            discount_amount=round(discount_amount, 2),
-            final_amount=round(final_amount, 2),
-            message=f"Valid coupon: {discount_percentage}% discount applied"
+            **coupon_cache.get_coupons(db).validate(request.coupon_code, request.total_amount)
         )
 
     except Exception as e:
+        logger.exception("Error validating coupon")
         raise HTTPException(status_code=500, detail=f"Error validating coupon: {str(e)}")
 
 
 @router.get("/available", response_model=List[AvailableCouponResponse])
 def get_available_coupons(db: Session = Depends(get_db)):
     """
-    Get all available active coupons for dropdown
+    Get all available active coupons for dropdown.
+    The list is precomputed and only re-derived when a coupon starts or ends.
     """
-    from sqlalchemy import text
-
     try:
-        # Query to get all active coupons within valid date range
-        query = text("""
-            SELECT code, discount_type, discount_value, min_order_value, description
-            FROM admin_coupons
-            WHERE is_active = true
-                AND start_date <= NOW()
-                AND end_date >= NOW()
-            ORDER BY code ASC
-        """)
-
-        results = db.execute(query).fetchall()
-
-        return [
-            AvailableCouponResponse(
-                code=row[0],
-                discount_type=row[1],
-                discount_value=float(row[2]),
-                min_order_value=float(row[3]) if row[3] is not None else None,
-                description=row[4] or ""
-            ) for row in results
-        ]
+        return coupon_cache.get_coupons(db).available()
 
     except Exception as e:
+        logger.exception("Error fetching available coupons")
         raise HTTPException(status_code=500, detail=f"Error fetching available coupons: {str(e)}")
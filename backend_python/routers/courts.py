@@ -1,136 +1,410 @@
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import Optional
+from typing import Literal, Optional
+from datetime import datetime, timedelta
+import catalog
+import court_facets
+import court_listing
+import court_queries
+import court_search
+import crud
 import database
+import geo
+import occupancy
+import serialization
+import slot_holds
+import slot_templates
+import venue_time
+from logging_config import SAMPLED
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/courts",
     tags=["courts"]
 )
 
+MAX_AVAILABILITY_DAYS = 31
+MAX_NEARBY_RADIUS_KM = 50
+MAX_SUGGESTIONS = 20
+
+# Bump when the available-slots payload shape changes so cached ETags miss
+SLOTS_ETAG_FORMAT = "s1"
+
+
+def _parse_date(value: str):
+    """Parse a YYYY-MM-DD query parameter or raise a 400."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+
+
+def _blocked_mask(booked: dict, court_id: str, day) -> int:
+    """Cells of a court-day that are booked or held by someone in checkout.
+
+    `booked` is the (court_id, date) -> mask dict from crud.get_court_day_masks.
+    """
+    return booked.get((court_id, day), occupancy.EMPTY) | slot_holds.holds.held_mask(court_id, day)
+
+
+def _available_slots(template: slot_templates.CourtTemplate, day, booked: dict) -> list[dict]:
+    """Slots for `day` that overlap neither admin-disabled, booked nor held cells."""
+    return template.slots_for(day, _blocked_mask(booked, template.court_id, day))
+
+
+def _slots_etag(court_version, day_version: int, hold_version: str) -> str:
+    """Weak ETag for one court-day: admin rule, booking and hold versions."""
+    stamp = court_version.timestamp() if court_version else 0
+    return f'W/"{SLOTS_ETAG_FORMAT}-{stamp:.6f}-{day_version}-{hold_version}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes on either side
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+def _matching_courts(db: Session, branch_id=None, city=None, game_type=None) -> list[dict]:
+    """Active courts with their rule version, filtered like the listing endpoints."""
+    if catalog.CATALOG_ENABLED:
+        return catalog.get_catalog(db).filter(city=city, game_type=game_type, branch_id=branch_id)
+
+    return court_queries.list_courts(db, court_queries.MATCHING_COLUMNS, city=city, game_type=game_type, branch_id=branch_id)
+
+
+def _court_summary(court: dict) -> dict:
+    return {
+        "court_id": str(court['id']),
+        "court_name": court.get('court_name', ''),
+        "branch_id": str(court['branch_id']),
+        "branch_name": court.get('branch_name', ''),
+        "game_type": court.get('game_type', ''),
+    }
+
+
+# GET /courts/{court_id} serves every listing field except amenities
+_DETAIL_FIELDS = tuple(field for field in court_listing.COURT_FIELDS if field != "amenities")
+
+
+def _court_detail(court_dict: dict) -> dict:
+    """GET /courts/{court_id} payload from a catalog record or SQL row."""
+    return court_listing.format_court(court_dict, _DETAIL_FIELDS)
+
+
 @router.get("/")
 def get_courts(
+    request: Request,
     city: Optional[str] = None,
     game_type: Optional[str] = None,
     location: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Optional[Literal["name", "price", "popularity"]] = None,
+    limit: Optional[int] = Query(None, ge=1, le=court_listing.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(database.get_db)
 ):
     """
     Fetch courts from admin_courts table filtered by city and game type.
     This is used for the field booking section.
+    Served from the in-memory court catalog unless it is disabled.
+
+    `fields` (comma-separated) limits the returned fields, `sort` orders by
+    name, price or popularity, and with `limit` one page is returned at a
+    time: pass the `X-Next-Cursor` response header back as `cursor`.
     """
     try:
-        # Query from admin_courts with joins to get city, game type, and amenities info
-        query_sql = """
-            SELECT
-                ac.id,
-                ac.name as court_name,
-                ac.price_per_hour as prices,
-                ac.images as photos,
-                ac.videos,
-                ac.terms_and_conditions,
-                ac.created_at,
-                ac.updated_at,
-                ab.name as branch_name,
-                ab.address_line1 as location,
-                ab.search_location as description,
-                acity.name as city_name,
-                agt.name as game_type,
-                COALESCE(
-                    json_agg(
-                        json_build_object(
-                            'id', aa.id,
-                            'name', aa.name,
-                            'description', aa.description,
-                            'icon', aa.icon,
-                            'icon_url', aa.icon_url
-                        )
-                    ) FILTER (WHERE aa.id IS NOT NULL),
-                    '[]'::json
-                ) as amenities
-            FROM admin_courts ac
-            JOIN admin_branches ab ON ac.branch_id = ab.id
-            JOIN admin_cities acity ON ab.city_id = acity.id
-            JOIN admin_game_types agt ON ac.game_type_id = agt.id
-            LEFT JOIN admin_branch_amenities aba ON ab.id = aba.branch_id
-            LEFT JOIN admin_amenities aa ON aba.amenity_id = aa.id AND aa.is_active = true
-        """
+        try:
+            wanted_fields = court_listing.parse_fields(fields, court_listing.COURT_FIELDS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if catalog.CATALOG_ENABLED:
+            courts = catalog.get_catalog(db).filter(city=city or location, game_type=game_type)
+        else:
+            courts = court_queries.list_courts(
+                db, court_listing.columns_for(wanted_fields, sort),
+                city=city or location, game_type=game_type,
+                with_amenities="amenities" in wanted_fields
+            )
+
+        logger.debug("Found %d courts", len(courts), extra=SAMPLED)
+
+        try:
+            page, next_cursor = court_listing.paginate(db, courts, sort, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return serialization.negotiated_response(
+            request,
+            [court_listing.format_court(court, wanted_fields) for court in page],
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error listing courts")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        params = {}
-        where_conditions = ["ac.is_active = true"]
+@router.get("/availability-grid")
+def get_availability_grid(
+    date: str,  # Format: YYYY-MM-DD
+    branch_id: Optional[str] = None,
+    city: Optional[str] = None,
+    game_type: Optional[str] = None,
+    db: Session = Depends(database.get_db)
+):
+    """
+    Get the available slots of every active court at a branch, or in a city
+    (optionally narrowed by game type), for one date. Court rules and bookings
+    for all matching courts are loaded in bulk rather than once per court.
+    """
+    try:
+        booking_date = _parse_date(date)
+        if not branch_id and not city:
+            raise HTTPException(status_code=400, detail="Either branch_id or city is required")
 
-        # Filter by city OR location (they're the same in your case)
-        if city or location:
-            city_filter = city or location
-            city_filter = city_filter.strip()  # Remove trailing spaces
-            where_conditions.append("LOWER(acity.name) = LOWER(:city)")
-            params['city'] = city_filter
+        courts = _matching_courts(db, branch_id=branch_id, city=city, game_type=game_type)
 
-        # Add WHERE clause
-        query_sql += " WHERE " + " AND ".join(where_conditions)
+        court_ids = [str(court['id']) for court in courts]
+        templates = slot_templates.get_court_templates(
+            db, {str(court['id']): court['updated_at'] for court in courts}
+        )
+        booked = crud.get_court_day_masks(db, court_ids, booking_date, booking_date)
 
-        # Add GROUP BY
-        query_sql += """
-            GROUP BY ac.id, ac.name, ac.price_per_hour, ac.images, ac.videos, ac.terms_and_conditions,
-                     ac.created_at, ac.updated_at, ab.name, ab.address_line1, ab.search_location,
-                     acity.name, agt.name
-        """
-        
-        # Filter by game type if provided (handle array of game types)
-        if game_type and game_type != "undefined":
-            if isinstance(game_type, list):
-                # Handle array of game types
-                placeholders = ','.join([f":game_type_{i}" for i in range(len(game_type))])
-                where_conditions.append(f"agt.name IN ({placeholders})")
-                for i, gt in enumerate(game_type):
-                    params[f'game_type_{i}'] = gt.strip()
-            else:
-                where_conditions.append("agt.name ILIKE :game_type")
-                params['game_type'] = f"%{game_type}%"
-
-        # Update WHERE clause if we have additional conditions
-        if len(where_conditions) > 1:
-            query_sql = query_sql.replace(" WHERE ac.is_active = true", " WHERE " + " AND ".join(where_conditions))
-        
-        print(f"[COURTS API] Query: {query_sql}")
-        print(f"[COURTS API] Params: {params}")
-        
-        result_proxy = db.execute(text(query_sql), params)
-        courts = result_proxy.fetchall()
-        
-        print(f"[COURTS API] Found {len(courts)} courts")
-        
-        # Convert to dict format
-        result = []
+        grid = []
         for court in courts:
-            court_dict = dict(court._mapping)
-            result.append({
-                "id": str(court_dict['id']),
-                "court_name": court_dict.get('court_name', ''),
-                "location": f"{court_dict.get('location', '')}, {court_dict.get('city_name', '')}",
-                "game_type": court_dict.get('game_type', ''),
-                "prices": str(court_dict.get('prices', '0')),
-                "description": court_dict.get('description', '') or f"{court_dict.get('branch_name', '')} - {court_dict.get('game_type', '')} Court",
-                "terms_and_conditions": court_dict.get('terms_and_conditions', ''),
-                "amenities": court_dict.get('amenities', []) or [],
-                "photos": court_dict.get('photos', []) or [],
-                "videos": court_dict.get('videos', []) or [],
-                "created_at": court_dict['created_at'].isoformat() if court_dict.get('created_at') else None,
-                "updated_at": court_dict['updated_at'].isoformat() if court_dict.get('updated_at') else None,
+            court_id = str(court['id'])
+            template = templates.get(court_id)
+            if template is None:
+                continue
+            grid.append({
+                **_court_summary(court),
+                "slots": _available_slots(template, booking_date, booked),
             })
-        
-        return result
+
+        logger.debug("Built availability grid for %d courts on %s", len(grid), date)
+
+        return {
+            "date": date,
+            "courts": grid
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error building availability grid")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/next-available")
+def get_next_available_slots(
+    city: Optional[str] = None,
+    game_type: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=50),
+    days: int = Query(7, ge=1, le=MAX_AVAILABILITY_DAYS),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Find the earliest free slots across every active court matching a city
+    and/or game type. Walks forward from now, one day at a time, and stops
+    once `limit` slots are found or the `days` horizon is exhausted.
+    """
+    try:
+        now = venue_time.now()
+        today = now.date()
+        last_day = today + timedelta(days=days - 1)
+        now_minute = now.hour * 60 + now.minute
+
+        courts = _matching_courts(db, city=city, game_type=game_type)
+        court_ids = [str(court['id']) for court in courts]
+        templates = slot_templates.get_court_templates(
+            db, {str(court['id']): court['updated_at'] for court in courts}
+        )
+        booked = crud.get_court_day_masks(db, court_ids, today, last_day)
+
+        found = []
+        day = today
+        while day <= last_day and len(found) < limit:
+            candidates = []
+            for court in courts:
+                template = templates.get(str(court['id']))
+                if template is None:
+                    continue
+                blocked_mask = _blocked_mask(booked, template.court_id, day)
+                for slot in template.plan_for(day).free(blocked_mask):
+                    if day == today and slot.start_minute <= now_minute:
+                        continue
+                    candidates.append((slot.start_minute, slot.payload['price'], court, slot))
+
+            # Earliest first, cheapest first on ties
+            candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
+            for _, _, court, slot in candidates[:limit - len(found)]:
+                found.append({**_court_summary(court), "date": day.isoformat(), **slot.payload})
+            day += timedelta(days=1)
+
+        logger.debug("Next-available search over %d courts found %d slots", len(courts), len(found))
+
+        return {
+            "slots": found,
+            "searched_until": (day - timedelta(days=1)).isoformat()
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error searching next available slots")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/nearby")
+def get_nearby_courts(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(10, gt=0, le=MAX_NEARBY_RADIUS_KM),
+    game_type: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=court_listing.MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: Session = Depends(database.get_db)
+):
+    """
+    The `limit` active courts nearest to a point within `radius` km, nearest
+    first, each with its `distance_km`. Courts whose branch has no
+    coordinates are never returned.
+    """
+    try:
+        try:
+            wanted_fields = court_listing.parse_fields(fields, court_listing.COURT_FIELDS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if catalog.CATALOG_ENABLED:
+            hits = catalog.get_catalog(db).nearby(lat, lon, radius, game_type=game_type, limit=limit)
+        else:
+            courts = court_queries.list_courts(
+                db, court_listing.columns_for(wanted_fields, None) + court_queries.NEARBY_COLUMNS,
+                game_type=game_type,
+                with_amenities="amenities" in wanted_fields,
+                box=geo.bounding_box(lat, lon, radius)
+            )
+            hits = [
+                (geo.haversine_km(lat, lon, court['latitude'], court['longitude']), court)
+                for court in courts
+            ]
+            hits = sorted((hit for hit in hits if hit[0] <= radius), key=lambda hit: hit[0])[:limit]
+
+        logger.debug("Found %d courts within %skm", len(hits), radius, extra=SAMPLED)
+
+        return [
+            {**court_listing.format_court(court, wanted_fields), "distance_km": round(distance, 2)}
+            for distance, court in hits
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error searching nearby courts")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/facets")
+def get_court_facets(
+    city: Optional[str] = None,
+    game_type: Optional[str] = None,
+    location: Optional[str] = None,
+    db: Session = Depends(database.get_db)
+):
+    """
+    Active court counts by city, game type, branch and price band for the
+    same filters as GET /courts/, for the discovery screen's chips.
+    """
+    try:
+        if catalog.CATALOG_ENABLED:
+            return catalog.get_catalog(db).facets_for(city=city or location, game_type=game_type)
+
+        courts = court_queries.list_courts(
+            db, court_facets.FACET_COLUMNS, city=city or location, game_type=game_type
+        )
+        return court_facets.compute(courts)
     except Exception as e:
-        print(f"[COURTS API] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error counting court facets")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/search")
+def search_courts(
+    q: str = Query(..., min_length=1, max_length=100),
+    city: Optional[str] = None,
+    game_type: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=court_listing.MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    db: Session = Depends(database.get_db)
+):
+    """
+    Ranked, typo-tolerant search over court, branch, address and area names,
+    optionally narrowed by city and game type. Each court carries its `score`.
+    With the catalog disabled, the matching courts are read from the database
+    and indexed for this request.
+    """
+    try:
+        try:
+            wanted_fields = court_listing.parse_fields(fields, court_listing.COURT_FIELDS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if catalog.CATALOG_ENABLED:
+            snapshot = catalog.get_catalog(db)
+            allowed = None
+            if city or (game_type and game_type != "undefined"):
+                matching_ids = {court['id'] for court in snapshot.filter(city=city, game_type=game_type)}
+                allowed = lambda court: court['id'] in matching_ids
+            hits = snapshot.search.search(q, limit=limit, allowed=allowed)
+        else:
+            courts = court_queries.list_courts(
+                db, court_listing.columns_for(wanted_fields, None) + court_queries.SEARCH_COLUMNS,
+                city=city, game_type=game_type,
+                with_amenities="amenities" in wanted_fields
+            )
+            hits = court_search.CourtSearch(courts).search(q, limit=limit)
+        logger.debug("Search %r matched %d courts", q, len(hits), extra=SAMPLED)
+
+        return [
+            {**court_listing.format_court(court, wanted_fields), "score": round(score, 3)}
+            for score, court in hits
+        ]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error searching courts")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/autocomplete")
+def autocomplete_courts(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(database.get_db)
+):
+    """Venue, court, area and city names completing what the user has typed so far."""
+    try:
+        if catalog.CATALOG_ENABLED:
+            search = catalog.get_catalog(db).search
+        else:
+            search = court_search.CourtSearch(court_queries.list_courts(db, court_queries.SEARCH_COLUMNS))
+        return {"suggestions": search.suggest(q, limit)}
+    except Exception as e:
+        logger.exception("Error building autocomplete suggestions")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{court_id}")
 def get_court(court_id: str, db: Session = Depends(database.get_db)):
     """Get a single court by ID"""
     try:
+        # Active courts come from the catalog; inactive ones still resolve through SQL
+        court = catalog.get_catalog(db).by_id.get(court_id) if catalog.CATALOG_ENABLED else None
+        if court is not None:
+            return _court_detail(court)
+
         query_sql = """
             SELECT
                 ac.id,
@@ -159,260 +433,153 @@ def get_court(court_id: str, db: Session = Depends(database.get_db)):
         if not court:
             raise HTTPException(status_code=404, detail="Court not found")
         
-        court_dict = dict(court._mapping)
-        return {
-            "id": str(court_dict['id']),
-            "court_name": court_dict.get('court_name', ''),
-            "location": f"{court_dict.get('location', '')}, {court_dict.get('city_name', '')}",
-            "game_type": court_dict.get('game_type', ''),
-            "prices": str(court_dict.get('prices', '0')),
-            "description": court_dict.get('description', '') or f"{court_dict.get('branch_name', '')} - {court_dict.get('game_type', '')} Court",
-            "terms_and_conditions": court_dict.get('terms_and_conditions', ''),
-            "photos": court_dict.get('photos', []) or [],
-            "videos": court_dict.get('videos', []) or [],
-            "created_at": court_dict['created_at'].isoformat() if court_dict.get('created_at') else None,
-            "updated_at": court_dict['updated_at'].isoformat() if court_dict.get('updated_at') else None,
-        }
+        return _court_detail(dict(court._mapping))
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[COURTS API] Error getting court: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting court")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{court_id}/available-slots")
 def get_available_slots(
     court_id: str,
     date: str,  # Format: YYYY-MM-DD
+    request: Request,
     db: Session = Depends(database.get_db)
 ):
     """
     Get available time slots for a specific court on a specific date.
     Returns slots based on admin configuration minus booked slots.
+
+    The response carries an ETag built from the court's `updated_at`, the
+    court-day version and the court-day's hold version, so polling clients
+    can send `If-None-Match` and get a 304 without the slots being regenerated.
     """
     try:
-        from datetime import datetime, time, timedelta
-        import json
-        
-        # Parse the date
-        try:
-            booking_date = datetime.strptime(date, "%Y-%m-%d").date()
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
-        # Get court details with timing data from price_conditions and unavailability_slots
-        court_query = """
-            SELECT
-                ac.id,
-                ac.price_per_hour,
-                ac.price_conditions,
-                ac.unavailability_slots,
-                ab.id as branch_id
-            FROM admin_courts ac
-            JOIN admin_branches ab ON ac.branch_id = ab.id
-            WHERE ac.id = :court_id AND ac.is_active = true
-        """
+        booking_date = _parse_date(date)
 
-        result = db.execute(text(court_query), {"court_id": court_id})
-        court = result.fetchone()
+        # Court version and the day's occupancy come from one primary-key lookup
+        state = crud.get_court_day_state(db, court_id, booking_date)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Court not found")
+        version, booked_mask, day_version = state
 
-        if not court:
+        etag = _slots_etag(version, day_version, slot_holds.holds.version(court_id, booking_date))
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        # Pricing and unavailability rules are compiled once per court version
+        template = slot_templates.get_court_templates(db, {court_id: version}).get(court_id)
+        if template is None:
             raise HTTPException(status_code=404, detail="Court not found")
 
-        court_dict = dict(court._mapping)
-        price_per_hour = float(court_dict['price_per_hour'])
-        timing_config = court_dict.get('price_conditions') or []  # Slot configurations with pricing
-        unavailability_data = court_dict.get('unavailability_slots') or []  # Slots to disable
-
-
-
-        # Get current day of week (lowercase 3-letter format)
-        day_of_week = booking_date.strftime("%A").lower()[:3]  # mon, tue, wed, etc.
-        date_str = date  # YYYY-MM-DD format for date-specific matching
-
-        # Process all timing configurations that match the current day OR specific date
-        matching_configs = []
-        date_specific_configs = []
-        day_specific_configs = []
-
-        # Check if court has price_conditions data
-        if isinstance(timing_config, list) and len(timing_config) > 0:
-            print(f"[COURTS API] ✅ Court has {len(timing_config)} price_conditions for {court_id}")
-
-            # Find ALL timing configs that match the current day OR specific date
-            for i, timing in enumerate(timing_config):
-                if isinstance(timing, dict):
-                    # Priority 1: Check for specific date matches (highest priority)
-                    if 'dates' in timing and isinstance(timing.get('dates'), list):
-                        dates_list = timing.get('dates', [])
-                        if date_str in dates_list:
-                            slot_from = timing.get('slotFrom', '08:00')
-                            slot_to = timing.get('slotTo', '22:00')
-                            price_config = timing.get('price', str(price_per_hour))
-
-                            print(f"[COURTS API] ✓ DATE-SPECIFIC Config {i+1}: {date_str}, {slot_from}-{slot_to}, ₹{price_config}")
-
-                            try:
-                                start_hour = int(slot_from.split(':')[0])
-                                end_hour = int(slot_to.split(':')[0])
-                                config_price = float(price_config)
-
-                                date_specific_configs.append({
-                                    'start_hour': start_hour,
-                                    'end_hour': end_hour,
-                                    'price': config_price,
-                                    'id': timing.get('id'),
-                                    'type': 'date-specific'
-                                })
-                            except (ValueError, IndexError) as e:
-                                print(f"[COURTS API] ❌ Error parsing date-specific config {i+1}: {e}")
-                    
-                    # Priority 2: Check for day-of-week matches (lower priority)
-                    elif 'days' in timing:
-                        days_list = timing.get('days', [])
-                        day_matches = [day.lower()[:3] for day in days_list] if isinstance(days_list, list) else []
-
-                        if day_of_week in day_matches:
-                            slot_from = timing.get('slotFrom', '08:00')
-                            slot_to = timing.get('slotTo', '22:00')
-                            price_config = timing.get('price', str(price_per_hour))
-
-                            print(f"[COURTS API] ✓ DAY-SPECIFIC Config {i+1}: {slot_from}-{slot_to}, ₹{price_config}")
-
-                            try:
-                                start_hour = int(slot_from.split(':')[0])
-                                end_hour = int(slot_to.split(':')[0])
-                                config_price = float(price_config)
-
-                                day_specific_configs.append({
-                                    'start_hour': start_hour,
-                                    'end_hour': end_hour,
-                                    'price': config_price,
-                                    'id': timing.get('id'),
-                                    'type': 'day-specific'
-                                })
-                            except (ValueError, IndexError) as e:
-                                print(f"[COURTS API] ❌ Error parsing day-specific config {i+1}: {e}")
-            
-            # Use date-specific configs if available, otherwise fall back to day-specific
-            if date_specific_configs:
-                matching_configs = date_specific_configs
-                print(f"[COURTS API] Using {len(date_specific_configs)} DATE-SPECIFIC configurations")
-            elif day_specific_configs:
-                matching_configs = day_specific_configs
-                print(f"[COURTS API] Using {len(day_specific_configs)} DAY-SPECIFIC configurations")
-        
-        # FALLBACK: Generate default slots if no configurations found
-        if not matching_configs:
-            print(f"[COURTS API] ⚠️ Court {court_id} has NO matching price_conditions - generating default slots")
-            for hour in range(8, 22):  # 8 AM to 10 PM
-                matching_configs.append({
-                    'start_hour': hour,
-                    'end_hour': hour + 1,  # Each slot is 1 hour
-                    'price': price_per_hour,
-                    'id': f'default-{hour}',
-                    'type': 'default'
-                })
-
-        # Generate time slots from all matching configurations
-        all_slots = []
-
-        for config in matching_configs:
-            print(f"[COURTS API] Generating slots: {config['start_hour']}-{config['end_hour']}h, ₹{config['price']}")
-            for hour in range(config['start_hour'], config['end_hour']):
-                time_str = f"{hour:02d}:00"
-                period = "AM" if hour < 12 else "PM"
-                display_hour = hour
-                if display_hour > 12:
-                    display_hour -= 12
-                if display_hour == 0:
-                    display_hour = 12
-
-                # Calculate end time for display
-                end_hour = (hour + 1) % 24
-                end_period = "AM" if end_hour < 12 else "PM"
-                if end_hour > 12:
-                    end_display_hour = end_hour - 12
-                elif end_hour == 0:
-                    end_display_hour = 12
-                else:
-                    end_display_hour = end_hour
-
-                slot = {
-                    "time": time_str,
-                    "end_time": f"{end_hour:02d}:00",
-                    "display_time": f"{display_hour:02d}:00 {period} - {end_display_hour:02d}:00 {end_period}",
-                    "price": config['price'],
-                    "available": True
-                }
-                all_slots.append(slot)
-
-        print(f"[COURTS API] Total slots generated: {len(all_slots)}")
-        
-        # Filter out unavailable slots from admin configuration (unavailability_slots column)
-        day_of_week = booking_date.strftime("%A")  # Monday, Tuesday, etc.
-
-        for unavail in unavailability_data:
-            # Check if unavailability applies to this date
-            if isinstance(unavail, dict):
-                # Check days of week - disable slots on specific days
-                if 'days' in unavail and isinstance(unavail['days'], list):
-                    days_config = [day.lower().capitalize() for day in unavail['days']]  # Convert to title case
-                    if day_of_week in days_config:
-                        unavail_times = unavail.get('times', [])
-                        if isinstance(unavail_times, list):
-                            for slot in all_slots:
-                                if slot['time'] in unavail_times:
-                                    slot['available'] = False
-                                    print(f"[COURTS API] Disabled slot {slot['time']} due to day unavailability")
-
-                # Check specific dates - disable slots on specific dates
-                if 'dates' in unavail and isinstance(unavail['dates'], list):
-                    if date in unavail['dates']:
-                        unavail_times = unavail.get('times', [])
-                        if isinstance(unavail_times, list):
-                            for slot in all_slots:
-                                if slot['time'] in unavail_times:
-                                    slot['available'] = False
-                                    print(f"[COURTS API] Disabled slot {slot['time']} due to date unavailability")
-
-        print(f"[COURTS API] Applied unavailability filters from {len(unavailability_data)} configurations")
-        
-        # Filter out already booked slots
-        booked_query = """
-            SELECT start_time
-            FROM booking
-            WHERE court_id = :court_id
-              AND booking_date = :booking_date
-              AND status != 'cancelled'
-        """
-        
-        booked_result = db.execute(
-            text(booked_query),
-            {"court_id": court_id, "booking_date": booking_date}
+        blocked_mask = booked_mask | slot_holds.holds.held_mask(court_id, booking_date)
+        available_slots = template.slots_for(booking_date, blocked_mask)
+
+        logger.debug("Found %d available slots for court %s on %s", len(available_slots), court_id, date, extra=SAMPLED)
+
+        return serialization.negotiated_response(
+            request,
+            {
+                "court_id": court_id,
+                "date": date,
+                "slots": available_slots
+            },
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
         )
-        booked_slots = [row[0] for row in booked_result]
-        
-        for slot in all_slots:
-            if slot['time'] in booked_slots:
-                slot['available'] = False
-        
-        # Return only available slots
-        available_slots = [s for s in all_slots if s['available']]
-        
-        print(f"[COURTS API] Found {len(available_slots)} available slots for court {court_id} on {date}")
-        
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error getting available slots")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{court_id}/availability")
+def get_availability_range(
+    court_id: str,
+    date_from: str = Query(..., alias="from"),  # Format: YYYY-MM-DD
+    date_to: str = Query(..., alias="to"),  # Format: YYYY-MM-DD, inclusive
+    db: Session = Depends(database.get_db)
+):
+    """
+    Get available time slots for a court over a range of dates.
+    The court rules and all bookings in the range are fetched once, so a
+    date strip costs the same number of queries as a single day.
+    """
+    try:
+        start_date = _parse_date(date_from)
+        end_date = _parse_date(date_to)
+        if end_date < start_date:
+            raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+        day_count = (end_date - start_date).days + 1
+        if day_count > MAX_AVAILABILITY_DAYS:
+            raise HTTPException(status_code=400, detail=f"Date range cannot exceed {MAX_AVAILABILITY_DAYS} days")
+
+        template = slot_templates.get_court_template(db, court_id)
+        if template is None:
+            raise HTTPException(status_code=404, detail="Court not found")
+
+        booked = crud.get_court_day_masks(db, [court_id], start_date, end_date)
+
+        days = []
+        for offset in range(day_count):
+            day = start_date + timedelta(days=offset)
+            days.append({
+                "date": day.isoformat(),
+                "slots": _available_slots(template, day, booked),
+            })
+
+        return {
+            "court_id": court_id,
+            "from": start_date.isoformat(),
+            "to": end_date.isoformat(),
+            "days": days
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error getting availability range")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{court_id}/quote")
+def get_price_quote(
+    court_id: str,
+    date: str,  # Format: YYYY-MM-DD
+    start_time: str,  # AM/PM format supported (e.g. "05:00 PM")
+    duration_minutes: int = Query(60, gt=0, le=24 * 60),
+    number_of_players: int = Query(2, ge=1),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Price a booking exactly as POST /bookings/ will charge it.
+    Prices come from the court's compiled template, so no rules are read
+    from the database unless the court has changed.
+    """
+    try:
+        booking_date = _parse_date(date)
+        clock_time = crud.parse_clock_time(start_time)
+        if clock_time is None:
+            raise HTTPException(status_code=400, detail="Invalid start_time")
+        start_minute = occupancy.parse_minutes(clock_time)
+
+        template = slot_templates.get_court_template(db, court_id)
+        if template is None:
+            raise HTTPException(status_code=404, detail="Court not found")
+
+        quote = template.quote(booking_date, start_minute, duration_minutes, number_of_players)
         return {
             "court_id": court_id,
             "date": date,
-            "slots": available_slots
+            "start_time": occupancy.format_minutes(start_minute),
+            "end_time": occupancy.format_minutes(start_minute + duration_minutes),
+            "duration_minutes": duration_minutes,
+            "number_of_players": number_of_players,
+            **quote
         }
-        
+
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[COURTS API] Error getting available slots: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting price quote")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 import models, schemas, database
+import catalog
+import court_listing
+import court_queries
+import serialization
 import uuid
+from logging_config import SAMPLED
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/venues",
@@ -11,87 +19,50 @@ router = APIRouter(
 
 @router.get("/")
 def get_venues(
+    request: Request,
     city: Optional[str] = None,
     game_type: Optional[str] = None,
     location: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Optional[Literal["name", "price", "popularity"]] = None,
+    limit: Optional[int] = Query(None, ge=1, le=court_listing.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(database.get_db)
 ):
+    """Courts listed as venues; served from the in-memory court catalog unless it is disabled.
+
+    Supports the same `fields`, `sort`, `limit` and `cursor` parameters as GET /courts/.
+    """
     try:
-        # Query from admin_courts with joins to get city and game type info
-        from sqlalchemy import text
-        
-        query_sql = """
-            SELECT 
-                ac.id,
-                ac.name as court_name,
-                ac.price_per_hour as prices,
-                ac.images as photos,
-                ac.videos,
-                ac.created_at,
-                ac.updated_at,
-                ab.name as branch_name,
-                ab.address_line1 as location,
-                ab.search_location as description,
-                acity.name as city_name,
-                agt.name as game_type
-            FROM admin_courts ac
-            JOIN admin_branches ab ON ac.branch_id = ab.id
-            JOIN admin_cities acity ON ab.city_id = acity.id
-            JOIN admin_game_types agt ON ac.game_type_id = agt.id
-            WHERE ac.is_active = true
-        """
-        
-        params = {}
-        
-        # Filter by city OR location (they're the same in your case)
-        if city or location:
-            city_filter = city or location
-            city_filter = city_filter.strip()  # Remove trailing spaces
-            query_sql += " AND LOWER(acity.name) = LOWER(:city)"
-            params['city'] = city_filter
-        
-        # Filter by game type if provided (handle array of game types)
-        if game_type and game_type != "undefined":
-            if isinstance(game_type, list):
-                # Handle array of game types
-                placeholders = ','.join([f":game_type_{i}" for i in range(len(game_type))])
-                query_sql += f" AND agt.name IN ({placeholders})"
-                for i, gt in enumerate(game_type):
-                    params[f'game_type_{i}'] = gt.strip()
-            else:
-                query_sql += " AND agt.name ILIKE :game_type"
-                params['game_type'] = f"%{game_type}%"
-        
-        print(f"[VENUES API] Query: {query_sql}")
-        print(f"[VENUES API] Params: {params}")
-        
-        result_proxy = db.execute(text(query_sql), params)
-        courts = result_proxy.fetchall()
-        
-        print(f"[VENUES API] Found {len(courts)} courts")
-        
-        # Convert to dict format
-        result = []
-        for court in courts:
-            court_dict = dict(court._mapping)
-            result.append({
-                "id": str(court_dict['id']),
-                "court_name": court_dict.get('court_name', ''),
-                "location": f"{court_dict.get('location', '')}, {court_dict.get('city_name', '')}",
-                "game_type": court_dict.get('game_type', ''),
-                "prices": str(court_dict.get('prices', '0')),
-                "description": court_dict.get('description', '') or f"{court_dict.get('branch_name', '')} - {court_dict.get('game_type', '')} Court",
-                "photos": court_dict.get('photos', []) or [],
-                "videos": court_dict.get('videos', []) or [],
-                "created_at": court_dict['created_at'].isoformat() if court_dict.get('created_at') else None,
-                "updated_at": court_dict['updated_at'].isoformat() if court_dict.get('updated_at') else None,
-            })
-        
-        return result
+        try:
+            wanted_fields = court_listing.parse_fields(fields, court_listing.VENUE_FIELDS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if catalog.CATALOG_ENABLED:
+            courts = catalog.get_catalog(db).filter(city=city or location, game_type=game_type)
+        else:
+            courts = court_queries.list_courts(
+                db, court_listing.columns_for(wanted_fields, sort),
+                city=city or location, game_type=game_type
+            )
+
+        logger.debug("Found %d courts", len(courts), extra=SAMPLED)
+
+        try:
+            page, next_cursor = court_listing.paginate(db, courts, sort, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return serialization.negotiated_response(
+            request,
+            [court_listing.format_court(court, wanted_fields) for court in page],
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else None
+        )
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error in get_venues: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_venues")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{venue_id}", response_model=schemas.AdminCourtResponse)
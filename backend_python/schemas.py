@@ -96,13 +96,22 @@ class BookingCreate(BaseModel):
     court_id: str
     booking_date: date
     start_time: str  # AM/PM format supported (e.g. "05:00 AM")
-    duration_minutes: int
-    number_of_players: int = 2
-    price_per_hour: float = 200.0
+    duration_minutes: int = Field(gt=0, le=24 * 60)
+    number_of_players: int = Field(2, ge=1)
+    price_per_hour: float = 200.0  # Ignored: the server quotes the price, see GET /courts/{id}/quote
     team_name: Optional[str] = None
     special_requests: Optional[str] = None
 
 
+class BookingBatchCreate(BaseModel):
+    """Several slots booked together, e.g. consecutive hours or courts.
+
+    All bookings are created in one transaction or none are.
+    """
+
+    bookings: List[BookingCreate] = Field(..., min_length=1, max_length=10)
+
+
 class BookingResponse(BaseModel):
     """Response model for bookings, based directly on the DB columns.
 
@@ -131,6 +140,39 @@ class BookingResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class BookingCourtSummary(BaseModel):
+    """Just enough about a booking's court to list it without calling /courts."""
+
+    court_id: str
+    court_name: Optional[str] = None
+    branch_id: Optional[str] = None
+    branch_name: Optional[str] = None
+    location: Optional[str] = None
+    city: Optional[str] = None
+    game_type: Optional[str] = None
+
+class BookingListResponse(BookingResponse):
+    """A booking in GET /bookings/; `court` is only filled with include_court=true."""
+
+    court: Optional[BookingCourtSummary] = None
+
+class SlotHoldCreate(BaseModel):
+    """Reserve a slot for a few minutes while the user checks out."""
+
+    court_id: str
+    booking_date: date
+    start_time: str  # AM/PM format supported (e.g. "05:00 AM")
+    duration_minutes: int = Field(60, gt=0, le=24 * 60)
+
+
+class SlotHoldResponse(BaseModel):
+    hold_id: str
+    court_id: str
+    booking_date: date
+    start_time: str
+    duration_minutes: int
+    expires_at: datetime
+
 # Token Schema
 class Token(BaseModel):
     access_token: str
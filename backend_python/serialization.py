@@ -0,0 +1,81 @@
+"""
+Response serialization: orjson for JSON and, when the optional `msgpack`
+package is installed, MessagePack for clients that ask for it.
+
+OrjsonResponse is the app's default response class. FastAPI still passes
+a plain return value through `jsonable_encoder` before the response class
+sees it, so the hot listing endpoints return `negotiated_response(...)`
+instead. Their payloads are already plain dicts, lists, strings and numbers,
+so the encoder's walk is pure overhead there.
+"""
+import decimal
+import uuid
+from datetime import date, datetime, time
+import orjson
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # MessagePack negotiation is simply off without it
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+
+def _orjson_default(value):
+    """Types orjson does not serialize natively, encoded like `jsonable_encoder` does."""
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _msgpack_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return _orjson_default(value)
+
+
+class OrjsonResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class MsgpackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        return msgpack.packb(content, default=_msgpack_default, datetime=False)
+
+
+def wants_msgpack(request: Request) -> bool:
+    """True if msgpack is installed and the Accept header lists it with q > 0."""
+    if msgpack is None:
+        return False
+    for entry in request.headers.get("accept", "").split(","):
+        media_type, *params = entry.split(";")
+        if media_type.strip().lower() not in _MSGPACK_MEDIA_TYPES:
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def negotiated_response(request: Request, content, status_code: int = 200, headers: dict | None = None) -> Response:
+    """MessagePack if the client asked for it, otherwise JSON; both skip `jsonable_encoder`."""
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if wants_msgpack(request):
+        return MsgpackResponse(content, status_code=status_code, headers=headers)
+    return OrjsonResponse(content, status_code=status_code, headers=headers)
@@ -0,0 +1,178 @@
+"""
+Short-lived slot holds taken while a user goes through checkout.
+
+A hold reserves some cells (see `occupancy`) of one court-day for
+SLOT_HOLD_TTL_SECONDS. Availability endpoints treat held cells as taken, other
+users cannot book or hold them, and the holder's booking consumes the hold.
+Holds expire on their own; nothing needs to clean them up.
+
+Bookings stay the source of truth: the database claim in crud.create_booking
+is what guarantees exclusivity, holds only keep competing users from racing
+for the same slot in the first place.
+"""
+import itertools
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+import occupancy
+from ttl_store import TTLStore
+
+SLOT_HOLD_TTL_SECONDS = int(os.getenv("SLOT_HOLD_TTL_SECONDS", "300"))
+MAX_HOLDS_PER_USER = int(os.getenv("MAX_HOLDS_PER_USER", "3"))
+
+# Distinguishes hold versions across restarts, since they live in memory
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class HoldConflictError(Exception):
+    """The cells are held by another user, or the user has too many holds."""
+
+
+class Hold:
+    __slots__ = ("id", "user_id", "court_id", "booking_date", "mask", "start_minute", "duration_minutes", "expires_at")
+
+    def __init__(self, user_id: str, court_id: str, booking_date: date, start_minute: int, duration_minutes: int):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.court_id = court_id
+        self.booking_date = booking_date
+        self.start_minute = start_minute
+        self.duration_minutes = duration_minutes
+        self.mask = occupancy.span_mask(start_minute, start_minute + duration_minutes)
+        self.expires_at = datetime.now(timezone.utc) + timedelta(seconds=SLOT_HOLD_TTL_SECONDS)
+
+
+class HoldStore:
+    def __init__(self, ttl: float = SLOT_HOLD_TTL_SECONDS):
+        self._holds = TTLStore(ttl=ttl)  # hold id -> Hold, expires by itself
+        self._by_day: dict = {}  # (court_id, date) -> set of hold ids
+        self._versions: dict = {}  # (court_id, date) -> change counter, only while held
+        self._counter = itertools.count(1)
+
+    def _live_holds(self, key) -> list[Hold]:
+        """Live holds of a court-day, dropping ids whose hold has expired."""
+        ids = self._by_day.get(key)
+        if not ids:
+            return []
+        holds = []
+        for hold_id in list(ids):
+            hold = self._holds.get(hold_id)
+            if hold is None:
+                ids.discard(hold_id)
+                self._touch(key)
+            else:
+                holds.append(hold)
+        if not ids:
+            self._forget(key)
+        return holds
+
+    def _touch(self, key) -> None:
+        self._versions[key] = next(self._counter)
+
+    def _forget(self, key) -> None:
+        """Drop a court-day without holds; its version reads as 0 again."""
+        self._by_day.pop(key, None)
+        self._versions.pop(key, None)
+
+    def _sweep(self) -> None:
+        """Forget every court-day whose holds have all expired."""
+        for key in list(self._by_day):
+            self._live_holds(key)
+
+    def _add(self, hold: Hold) -> None:
+        key = (hold.court_id, hold.booking_date)
+        self._holds.set(hold.id, hold)
+        self._by_day.setdefault(key, set()).add(hold.id)
+        self._touch(key)
+
+    def _remove(self, hold: Hold) -> None:
+        key = (hold.court_id, hold.booking_date)
+        self._holds.pop(hold.id)
+        ids = self._by_day.get(key)
+        if ids is not None:
+            ids.discard(hold.id)
+        if ids:
+            self._touch(key)
+        else:
+            self._forget(key)
+
+    def held_mask(self, court_id: str, booking_date: date, exclude_user: str | None = None) -> int:
+        """Cells of a court-day held by anyone (other than `exclude_user`)."""
+        with self._holds.lock:
+            mask = occupancy.EMPTY
+            for hold in self._live_holds((court_id, booking_date)):
+                if hold.user_id != exclude_user:
+                    mask |= hold.mask
+            return mask
+
+    def version(self, court_id: str, booking_date: date) -> str:
+        """Changes whenever the holds of a court-day change, including expiry."""
+        with self._holds.lock:
+            key = (court_id, booking_date)
+            self._live_holds(key)
+            return f"{_BOOT_ID}.{self._versions.get(key, 0)}"
+
+    def create(self, user_id: str, court_id: str, booking_date: date, start_minute: int, duration_minutes: int) -> Hold:
+        """Hold cells for `user_id`, replacing that user's overlapping holds."""
+        hold = Hold(user_id, court_id, booking_date, start_minute, duration_minutes)
+        with self._holds.lock:
+            # Court-days nobody asks about again would otherwise stay behind
+            self._sweep()
+            replaced = []
+            for existing in self._live_holds((court_id, booking_date)):
+                if not existing.mask & hold.mask:
+                    continue
+                if existing.user_id != user_id:
+                    raise HoldConflictError("This slot is being booked by someone else, try again shortly")
+                replaced.append(existing)
+
+            active = [
+                existing for _, existing in self._holds.items()
+                if existing.user_id == user_id and existing not in replaced
+            ]
+            if len(active) >= MAX_HOLDS_PER_USER:
+                raise HoldConflictError(f"You can hold at most {MAX_HOLDS_PER_USER} slots at a time")
+
+            for existing in replaced:
+                self._remove(existing)
+            self._add(hold)
+            return hold
+
+    def release(self, hold_id: str, user_id: str) -> bool:
+        with self._holds.lock:
+            hold = self._holds.get(hold_id)
+            if hold is None or hold.user_id != user_id:
+                return False
+            self._remove(hold)
+            return True
+
+    def take_for_booking(self, user_id: str, court_id: str, booking_date: date, mask: int) -> list[Hold]:
+        """Check no one else holds `mask` and remove the user's own overlapping holds.
+
+        Both happen under one lock. Returns the removed holds so they can be
+        put back with `restore` if the booking then fails.
+        """
+        with self._holds.lock:
+            taken = []
+            for hold in self._live_holds((court_id, booking_date)):
+                if not hold.mask & mask:
+                    continue
+                if hold.user_id != user_id:
+                    raise HoldConflictError("This slot is being booked by someone else, try again shortly")
+                taken.append(hold)
+            for hold in taken:
+                self._remove(hold)
+            return taken
+
+    def restore(self, holds: list[Hold]) -> None:
+        with self._holds.lock:
+            for hold in holds:
+                remaining = (hold.expires_at - datetime.now(timezone.utc)).total_seconds()
+                if remaining > 0:
+                    key = (hold.court_id, hold.booking_date)
+                    self._holds.set(hold.id, hold, ttl=remaining)
+                    self._by_day.setdefault(key, set()).add(hold.id)
+                    self._touch(key)
+
+
+holds = HoldStore()
@@ -0,0 +1,363 @@
+"""
+Compiled slot templates for admin courts.
+
+A court's `price_conditions` and `unavailability_slots` only change when an
+admin edits the court, yet every availability request used to re-parse them
+and rebuild every slot dict from scratch. This module compiles those rules
+once into per-weekday / per-date slot plans (see `occupancy` for the bitmap
+representation) and keeps the result in a bounded LRU cache keyed by court id
+plus `updated_at`, so a request only has to mask out booked cells.
+"""
+import logging
+import os
+import threading
+import time as time_module
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import bindparam, text
+import occupancy
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_CACHE_SIZE = int(os.getenv("SLOT_TEMPLATE_CACHE_SIZE", "512"))
+# Safety net for rows whose updated_at is not bumped by whoever edits them
+TEMPLATE_MAX_AGE_SECONDS = int(os.getenv("SLOT_TEMPLATE_MAX_AGE_SECONDS", "300"))
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# Length of a bookable slot, and of the window blocked by an unavailability time
+SLOT_MINUTES = 60
+
+# Opening hours used when a court has no matching price_conditions
+DEFAULT_OPEN_MINUTE = 8 * 60
+DEFAULT_CLOSE_MINUTE = 22 * 60
+
+
+class Slot:
+    """A prebuilt slot: its occupancy mask plus the dict served to clients.
+
+    The payload is shared by every response that includes the slot, so
+    callers must copy it before adding or changing keys.
+    """
+
+    __slots__ = ("start_minute", "end_minute", "price", "mask", "payload")
+
+    def __init__(self, start_minute: int, end_minute: int, price: float):
+        self.start_minute = start_minute
+        self.end_minute = end_minute
+        self.price = price
+        self.mask = occupancy.span_mask(start_minute, end_minute)
+        self.payload = {
+            "time": occupancy.format_minutes(start_minute),
+            "end_time": occupancy.format_minutes(end_minute),
+            "display_time": f"{occupancy.format_display(start_minute)} - {occupancy.format_display(end_minute)}",
+            "price": price,
+            "available": True,
+        }
+
+
+class PriceTable:
+    """Hourly price of every cell of a day, with prefix sums for O(1) quotes."""
+
+    __slots__ = ("hourly", "prefix")
+
+    def __init__(self, hourly: list[float]):
+        self.hourly = tuple(hourly)
+        prefix = [0.0]
+        for price in self.hourly:
+            prefix.append(prefix[-1] + price * occupancy.CELL_MINUTES / 60)
+        self.prefix = tuple(prefix)
+
+    def layered(self, slots) -> "PriceTable":
+        """A copy with `slots` priced on top; the first slot covering a cell wins."""
+        hourly = list(self.hourly)
+        for slot in reversed(slots):
+            first_cell = slot.start_minute // occupancy.CELL_MINUTES
+            end_cell = -(-slot.end_minute // occupancy.CELL_MINUTES)
+            hourly[first_cell:end_cell] = [slot.price] * (end_cell - first_cell)
+        return PriceTable(hourly)
+
+    def _cost_to(self, minute: int) -> float:
+        cell = minute // occupancy.CELL_MINUTES
+        if cell >= occupancy.CELLS_PER_DAY:
+            return self.prefix[-1]
+        return self.prefix[cell] + (minute - cell * occupancy.CELL_MINUTES) * self.hourly[cell] / 60
+
+    def cost(self, start_minute: int, end_minute: int) -> float:
+        """Price of [start_minute, end_minute) for one player; end is clipped to midnight."""
+        return self._cost_to(min(end_minute, occupancy.MINUTES_PER_DAY)) - self._cost_to(start_minute)
+
+
+class DayPlan:
+    """Compiled slots for one kind of day, the cells the admin disabled and cell prices."""
+
+    __slots__ = ("slots", "disabled_mask", "prices")
+
+    def __init__(self, slots: tuple, disabled_mask: int, prices: PriceTable):
+        self.slots = slots
+        self.disabled_mask = disabled_mask
+        self.prices = prices
+
+    def free(self, booked_mask: int = occupancy.EMPTY) -> list[Slot]:
+        blocked = self.disabled_mask | booked_mask
+        return [slot for slot in self.slots if not slot.mask & blocked]
+
+    def available(self, booked_mask: int = occupancy.EMPTY) -> list[dict]:
+        return [slot.payload for slot in self.free(booked_mask)]
+
+
+def _weekday_index(day_name) -> int | None:
+    """Map 'mon', 'Monday', 'MONDAY' etc. to 0-6, or None if unrecognised."""
+    if not isinstance(day_name, str):
+        return None
+    prefix = day_name.strip().lower()[:3]
+    return WEEKDAYS.index(prefix) if prefix in WEEKDAYS else None
+
+
+def _weekday_of(date_str) -> int | None:
+    try:
+        return date.fromisoformat(date_str).weekday()
+    except (TypeError, ValueError):
+        return None
+
+
+def _build_slots(start_minute: int, end_minute: int, price: float) -> tuple[Slot, ...]:
+    """Split [start, end) into SLOT_MINUTES slots; a shorter tail becomes its own slot."""
+    return tuple(
+        Slot(minute, min(minute + SLOT_MINUTES, end_minute), price)
+        for minute in range(start_minute, end_minute, SLOT_MINUTES)
+    )
+
+
+def _compile_config(timing: dict, base_price: float) -> tuple[Slot, ...] | None:
+    """Turn one price_conditions entry into its slots."""
+    start_minute = occupancy.parse_minutes(timing.get('slotFrom', '08:00'))
+    end_minute = occupancy.parse_minutes(timing.get('slotTo', '22:00'))
+    try:
+        price = float(timing.get('price', base_price))
+    except (ValueError, TypeError):
+        price = None
+    if start_minute is None or end_minute is None or price is None:
+        logger.warning("Skipping invalid price condition %s", timing.get('id'))
+        return None
+    if end_minute == 0:
+        end_minute = occupancy.MINUTES_PER_DAY  # "slotTo": "00:00" means midnight
+    return _build_slots(start_minute, end_minute, price)
+
+
+def _times_mask(times) -> int:
+    """Cells covered by a list of unavailable "HH:MM" slot start times."""
+    mask = occupancy.EMPTY
+    for value in times:
+        start_minute = occupancy.parse_minutes(value)
+        if start_minute is not None:
+            mask |= occupancy.span_mask(start_minute, start_minute + SLOT_MINUTES)
+    return mask
+
+
+class CourtTemplate:
+    """Pre-parsed pricing and unavailability rules for a single court."""
+
+    def __init__(self, court_id: str, version, price_per_hour, price_conditions, unavailability_slots):
+        self.court_id = court_id
+        self.version = version
+        self.price_per_hour = float(price_per_hour)
+
+        default_slots = _build_slots(DEFAULT_OPEN_MINUTE, DEFAULT_CLOSE_MINUTE, self.price_per_hour)
+
+        # Date-specific configs take priority over day-of-week configs,
+        # which in turn take priority over the default opening hours.
+        date_slots: dict[str, list] = {}
+        weekday_slots: list[list] = [[] for _ in WEEKDAYS]
+
+        for timing in price_conditions if isinstance(price_conditions, list) else []:
+            if not isinstance(timing, dict):
+                continue
+            if isinstance(timing.get('dates'), list):
+                slots = _compile_config(timing, self.price_per_hour)
+                if slots is None:
+                    continue
+                for date_str in timing['dates']:
+                    date_slots.setdefault(date_str, []).extend(slots)
+            elif 'days' in timing:
+                days = timing.get('days')
+                indexes = {_weekday_index(day) for day in days} if isinstance(days, list) else set()
+                indexes.discard(None)
+                if not indexes:
+                    continue
+                slots = _compile_config(timing, self.price_per_hour)
+                if slots is None:
+                    continue
+                for index in indexes:
+                    weekday_slots[index].extend(slots)
+
+        # Cells disabled by the admin, per weekday and per specific date
+        disabled_weekday = [occupancy.EMPTY for _ in WEEKDAYS]
+        disabled_date: dict[str, int] = {}
+
+        for unavail in unavailability_slots if isinstance(unavailability_slots, list) else []:
+            if not isinstance(unavail, dict):
+                continue
+            times = unavail.get('times', [])
+            if not isinstance(times, list) or not times:
+                continue
+            mask = _times_mask(times)
+            if isinstance(unavail.get('days'), list):
+                for day in unavail['days']:
+                    index = _weekday_index(day)
+                    if index is not None:
+                        disabled_weekday[index] |= mask
+            if isinstance(unavail.get('dates'), list):
+                for date_str in unavail['dates']:
+                    disabled_date[date_str] = disabled_date.get(date_str, occupancy.EMPTY) | mask
+
+        self.weekday_slots = tuple(tuple(slots) or default_slots for slots in weekday_slots)
+        self.disabled_weekday = tuple(disabled_weekday)
+
+        # Cell prices: date-specific over day-of-week over the base price
+        base_prices = PriceTable([self.price_per_hour] * occupancy.CELLS_PER_DAY)
+        weekday_prices = tuple(base_prices.layered(slots) for slots in weekday_slots)
+
+        self.weekday_plans = tuple(
+            DayPlan(self.weekday_slots[index], self.disabled_weekday[index], weekday_prices[index])
+            for index in range(len(WEEKDAYS))
+        )
+
+        # Only dates that override the weekday plan get a plan of their own
+        self.date_plans = {}
+        for date_str in set(date_slots) | set(disabled_date):
+            weekday = _weekday_of(date_str)
+            if weekday is None:
+                continue
+            slots = tuple(date_slots.get(date_str) or ()) or self.weekday_slots[weekday]
+            disabled = self.disabled_weekday[weekday] | disabled_date.get(date_str, occupancy.EMPTY)
+            prices = weekday_prices[weekday].layered(date_slots.get(date_str) or ())
+            self.date_plans[date_str] = DayPlan(slots, disabled, prices)
+
+    def plan_for(self, day: date) -> DayPlan:
+        return self.date_plans.get(day.isoformat()) or self.weekday_plans[day.weekday()]
+
+    def slots_for(self, day: date, booked_mask: int = occupancy.EMPTY) -> list[dict]:
+        """Slots for `day` not overlapping admin-disabled or booked cells."""
+        return self.plan_for(day).available(booked_mask)
+
+    def quote(self, day: date, start_minute: int, duration_minutes: int, number_of_players: int = 1) -> dict:
+        """Server-side price of a booking, in the same terms as the booking row.
+
+        Each minute is charged at the hourly price of its cell; minutes past
+        midnight are charged at the base price.
+        """
+        end_minute = start_minute + duration_minutes
+        per_player = self.plan_for(day).prices.cost(start_minute, end_minute)
+        overflow = max(0, end_minute - occupancy.MINUTES_PER_DAY)
+        per_player += overflow * self.price_per_hour / 60
+        hours = duration_minutes / 60.0
+        return {
+            "price_per_hour": round(per_player / hours, 2) if hours else self.price_per_hour,
+            "total_amount": round(per_player * number_of_players, 2),
+        }
+
+
+class TemplateCache:
+    """Thread-safe LRU of compiled templates, one entry per court."""
+
+    def __init__(self, maxsize: int = TEMPLATE_CACHE_SIZE, max_age: float = TEMPLATE_MAX_AGE_SECONDS):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, court_id: str, version) -> CourtTemplate | None:
+        with self._lock:
+            entry = self._entries.get(court_id)
+            if entry is None:
+                return None
+            template, loaded_at = entry
+            if template.version != version or time_module.monotonic() - loaded_at > self.max_age:
+                del self._entries[court_id]
+                return None
+            self._entries.move_to_end(court_id)
+            return template
+
+    def put(self, template: CourtTemplate) -> None:
+        with self._lock:
+            self._entries[template.court_id] = (template, time_module.monotonic())
+            self._entries.move_to_end(template.court_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def peek(self, court_id: str) -> CourtTemplate | None:
+        """Latest template for a court regardless of version, if still fresh.
+
+        For callers that verify the version themselves later on.
+        """
+        with self._lock:
+            entry = self._entries.get(court_id)
+            if entry is None or time_module.monotonic() - entry[1] > self.max_age:
+                return None
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+template_cache = TemplateCache()
+
+
+def get_court_templates(db, versions: dict) -> dict:
+    """Return compiled templates for several courts at once.
+
+    `versions` maps court id to the `updated_at` value the caller has just
+    read. Cached templates are reused and every miss is loaded with a single
+    `IN` query.
+    """
+    templates = {}
+    missing = []
+    for court_id, version in versions.items():
+        template = template_cache.get(court_id, version)
+        if template is None:
+            missing.append(court_id)
+        else:
+            templates[court_id] = template
+
+    if not missing:
+        return templates
+
+    rules_query = text("""
+        SELECT id, updated_at, price_per_hour, price_conditions, unavailability_slots
+        FROM admin_courts
+        WHERE id IN :court_ids
+    """).bindparams(bindparam("court_ids", expanding=True))
+
+    for row in db.execute(rules_query, {"court_ids": missing}):
+        rules = row._mapping
+        court_id = str(rules['id'])
+        template = CourtTemplate(
+            court_id,
+            rules['updated_at'],
+            rules['price_per_hour'],
+            rules.get('price_conditions') or [],
+            rules.get('unavailability_slots') or [],
+        )
+        template_cache.put(template)
+        templates[court_id] = template
+
+    logger.debug("Compiled %d court template(s)", len(missing))
+    return templates
+
+
+def get_court_template(db, court_id: str) -> CourtTemplate | None:
+    """Return the compiled template for an active court, or None if not found.
+
+    Only `updated_at` is read on a cache hit; the JSON rule columns are
+    fetched and compiled again only when the court has changed.
+    """
+    version_row = db.execute(
+        text("SELECT updated_at FROM admin_courts WHERE id = :court_id AND is_active = true"),
+        {"court_id": court_id}
+    ).fetchone()
+    if not version_row:
+        return None
+
+    return get_court_templates(db, {court_id: version_row[0]}).get(court_id)
@@ -0,0 +1,69 @@
+"""
+Signature-checked holder for in-process snapshots of admin tables.
+
+The court catalog and the coupon table both load a few rarely edited tables
+into memory. A SnapshotCache serves its snapshot for `check_seconds` without
+touching the database. After that, one request runs `signature_sql` (e.g. row
+counts and latest `updated_at`) and reloads only if the result changed, and a
+snapshot is reloaded unconditionally after `max_age` seconds. While one
+request refreshes, the others keep serving the current snapshot; a failed
+refresh is logged, the request's session is rolled back and the previous
+snapshot is kept.
+
+`load(db, signature)` builds a snapshot and must return an object with
+`signature` and `loaded_at` (a `time.monotonic()` value) attributes.
+"""
+import logging
+import threading
+import time as time_module
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    """Holds the current snapshot and refreshes it at most one request at a time."""
+
+    def __init__(self, name: str, signature_sql: str, load, check_seconds: float, max_age: float):
+        self.name = name
+        self.signature_sql = signature_sql
+        self.load = load
+        self.check_seconds = check_seconds
+        self.max_age = max_age
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db):
+        snapshot = self._snapshot
+        now = time_module.monotonic()
+        if snapshot is not None and now - self._checked_at < self.check_seconds:
+            return snapshot
+
+        if snapshot is None:
+            # Nothing to serve yet: everyone waits for the first load
+            with self._lock:
+                if self._snapshot is None:
+                    self._refresh(db, force=True)
+                return self._snapshot
+
+        # Someone else is already refreshing; serve the current snapshot
+        if not self._lock.acquire(blocking=False):
+            return snapshot
+        try:
+            if time_module.monotonic() - self._checked_at >= self.check_seconds:
+                self._refresh(db, force=now - snapshot.loaded_at >= self.max_age)
+        except Exception:
+            logger.exception("%s refresh failed, serving the previous snapshot", self.name)
+            # Leave the request's session usable for the handler's own queries
+            db.rollback()
+            self._checked_at = time_module.monotonic()
+        finally:
+            self._lock.release()
+        return self._snapshot
+
+    def _refresh(self, db, force: bool) -> None:
+        signature = tuple(db.execute(text(self.signature_sql)).fetchone())
+        if force or self._snapshot is None or signature != self._snapshot.signature:
+            self._snapshot = self.load(db, signature)
+        self._checked_at = time_module.monotonic()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Stress test for booking exclusivity: fire hundreds of parallel POST /bookings/
+requests at the same court, date and time and check exactly one succeeds.
+
+Run against a live backend:
+    python test_concurrent_booking.py [court_id]
+
+API_URL defaults to http://localhost:8000. Without a court_id the first court
+returned by /courts/ is used. A random far-future date keeps reruns from
+colliding with each other.
+"""
+import os
+import sys
+import random
+import requests
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+API_URL = os.getenv("API_URL", "http://localhost:8000")
+PARALLEL_REQUESTS = int(os.getenv("PARALLEL_REQUESTS", "200"))
+TEST_PHONE = os.getenv("TEST_PHONE", "+919000000001")
+
+
+def get_token():
+    """Log in with the development OTP, creating the test user if needed."""
+    response = requests.post(
+        f"{API_URL}/auth/verify-otp",
+        json={"phone_number": TEST_PHONE, "otp_code": "12345", "full_name": "Concurrency Test"},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def get_court_id():
+    if len(sys.argv) > 1:
+        return sys.argv[1]
+    courts = requests.get(f"{API_URL}/courts/", timeout=30).json()
+    if not courts:
+        print("❌ No active courts found")
+        sys.exit(1)
+    return courts[0]["id"]
+
+
+def test_concurrent_booking():
+    print("=" * 60)
+    print(f"Testing {PARALLEL_REQUESTS} concurrent bookings for one slot")
+    print("=" * 60)
+
+    token = get_token()
+    court_id = get_court_id()
+    booking_date = date.today() + timedelta(days=random.randint(365, 3650))
+    payload = {
+        "court_id": court_id,
+        "booking_date": booking_date.isoformat(),
+        "start_time": "06:00 AM",
+        "duration_minutes": 60,
+        "number_of_players": 2,
+    }
+    headers = {"Authorization": f"Bearer {token}"}
+    print(f"Court: {court_id}, date: {booking_date}, time: {payload['start_time']}")
+
+    def book(_):
+        try:
+            return requests.post(f"{API_URL}/bookings/", json=payload, headers=headers, timeout=60).status_code
+        except requests.exceptions.RequestException as e:
+            return type(e).__name__
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_REQUESTS) as pool:
+        statuses = Counter(pool.map(book, range(PARALLEL_REQUESTS)))
+
+    print(f"Status codes: {dict(statuses)}")
+
+    assert statuses[200] == 1, f"Expected exactly one successful booking, got {statuses[200]}"
+    assert statuses[409] == PARALLEL_REQUESTS - 1, "Every losing request should get 409 Conflict"
+    print("✅ Exactly one booking won the slot")
+
+
+if __name__ == "__main__":
+    test_concurrent_booking()
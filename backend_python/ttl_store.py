@@ -0,0 +1,97 @@
+"""
+Small thread-safe in-process key/value store with per-entry expiry.
+
+The API runs as a single uvicorn process, so short-lived coordination state
+(idempotency keys, slot holds) lives here rather than in an extra service.
+Expired entries are dropped lazily on access and swept when the store fills up.
+"""
+import threading
+import time as time_module
+
+
+class TTLStore:
+    def __init__(self, ttl: float, maxsize: int = 10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: dict = {}  # key -> (expires_at, value), oldest first
+        self._lock = threading.RLock()
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Hold this to make several operations atomic."""
+        return self._lock
+
+    def _live(self, key, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def _make_room(self, now: float) -> None:
+        if len(self._entries) < self.maxsize:
+            return
+        self.purge(now)
+        while len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._live(key, time_module.monotonic())
+            return default if entry is None else entry[1]
+
+    def set(self, key, value, ttl: float | None = None) -> None:
+        with self._lock:
+            now = time_module.monotonic()
+            self._entries.pop(key, None)
+            self._make_room(now)
+            self._entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+
+    def add(self, key, value, ttl: float | None = None):
+        """Insert `value` unless a live entry exists.
+
+        Returns (True, value) when inserted, else (False, existing_value).
+        """
+        with self._lock:
+            now = time_module.monotonic()
+            entry = self._live(key, now)
+            if entry is not None:
+                return False, entry[1]
+            self.set(key, value, ttl)
+            return True, value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._live(key, time_module.monotonic())
+            if entry is None:
+                return default
+            del self._entries[key]
+            return entry[1]
+
+    def expires_in(self, key) -> float | None:
+        """Seconds until `key` expires, or None if it is absent."""
+        with self._lock:
+            now = time_module.monotonic()
+            entry = self._live(key, now)
+            return None if entry is None else entry[0] - now
+
+    def items(self) -> list:
+        """Snapshot of live (key, value) pairs."""
+        with self._lock:
+            now = time_module.monotonic()
+            return [(key, value) for key, (expires_at, value) in self._entries.items() if expires_at > now]
+
+    def purge(self, now: float | None = None) -> int:
+        """Drop expired entries; returns how many were removed."""
+        with self._lock:
+            now = time_module.monotonic() if now is None else now
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+            return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,21 @@
+"""
+Wall-clock time at the venues.
+
+Booking dates and times, slot rules and court-day rows are naive venue-local
+values, while the server may run in any timezone (Render runs in UTC). Code
+that compares them with "now" must take it from here, in VENUE_TZ.
+"""
+import os
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+VENUE_TZ = ZoneInfo(os.getenv("VENUE_TZ", "Asia/Kolkata"))
+
+
+def now() -> datetime:
+    """Current venue-local time as a naive datetime, like the stored booking values."""
+    return datetime.now(VENUE_TZ).replace(tzinfo=None)
+
+
+def today() -> date:
+    return now().date()
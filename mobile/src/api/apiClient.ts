@@ -60,12 +60,12 @@ class ApiClient {
     }
 
     /**
-     * Make authenticated request
+     * Make authenticated request and return the raw response
      */
-    async request<T>(
+    private async send(
         endpoint: string,
         options: RequestInit = {}
-    ): Promise<T> {
+    ): Promise<Response> {
         const token = await this.getToken();
         const headers: Record<string, string> = {
             'Content-Type': 'application/json',
@@ -112,9 +112,32 @@ class ApiClient {
             throw new Error(errorMessage);
         }
 
+        return response;
+    }
+
+    /**
+     * Make authenticated request
+     */
+    async request<T>(
+        endpoint: string,
+        options: RequestInit = {}
+    ): Promise<T> {
+        const response = await this.send(endpoint, options);
         return response.json();
     }
 
+    /**
+     * GET one page of a cursor-paginated list; the next cursor comes from
+     * the X-Next-Cursor response header (null on the last page)
+     */
+    async getPage<T>(endpoint: string): Promise<{ data: T; nextCursor: string | null }> {
+        const response = await this.send(endpoint, { method: 'GET' });
+        return {
+            data: await response.json(),
+            nextCursor: response.headers.get('X-Next-Cursor'),
+        };
+    }
+
     /**
      * POST request
      */
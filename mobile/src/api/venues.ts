@@ -245,29 +245,40 @@ export const bookingsApi = {
     },
 
     /**
-     * Get user's bookings
+     * Get one page of the user's bookings. Pass the returned nextCursor back
+     * as `cursor` to load the following page; it is null on the last page.
      */
-    getUserBookings: async (userId: string, statusFilter?: string) => {
+    getUserBookings: async (
+        userId: string,
+        statusFilter?: string,
+        options: { when?: 'upcoming' | 'past'; cursor?: string | null } = {}
+    ) => {
         try {
             // userId is ignored as backend uses token
-            const data = await apiClient.get<any[]>('/bookings/');
-
-            // Filter client-side if needed (or add backend filter)
-            let filteredData = data;
+            const params = ['include_court=true'];
             if (statusFilter) {
-                filteredData = data.filter(b => b.status === statusFilter);
+                params.push(`status=${encodeURIComponent(statusFilter)}`);
+            }
+            if (options.when) {
+                params.push(`when=${options.when}`);
+            }
+            if (options.cursor) {
+                params.push(`cursor=${encodeURIComponent(options.cursor)}`);
             }
+            const { data, nextCursor } = await apiClient.getPage<any[]>(`/bookings/?${params.join('&')}`);
 
-            console.log('[BOOKINGS API] Fetched user bookings:', filteredData?.length || 0);
+            console.log('[BOOKINGS API] Fetched user bookings:', data?.length || 0);
             return {
                 success: true,
-                data: filteredData,
+                data,
+                nextCursor,
             };
         } catch (error: any) {
             console.error('[BOOKINGS API] Exception fetching bookings:', error);
             return {
                 success: false,
                 data: [],
+                nextCursor: null,
                 error: error.message,
             };
         }
@@ -33,6 +33,15 @@ interface Booking {
     total_amount: number;
     status: string;
     created_at: string;
+    court?: {
+        court_id: string;
+        court_name?: string | null;
+        branch_id?: string | null;
+        branch_name?: string | null;
+        location?: string | null;
+        city?: string | null;
+        game_type?: string | null;
+    } | null;
 }
 
 const MyBookingsScreen: React.FC = () => {
@@ -42,19 +51,26 @@ const MyBookingsScreen: React.FC = () => {
     const [loading, setLoading] = useState(true);
     const [refreshing, setRefreshing] = useState(false);
     const [activeTab, setActiveTab] = useState('all'); // 'all', 'upcoming', 'completed', 'cancelled'
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
-    const loadBookings = async (statusFilter?: string) => {
+    // Pass `cursor` to append the next page instead of reloading the tab
+    const loadBookings = async (cursor?: string) => {
         try {
             if (!user?.id) {
                 console.error('User not authenticated');
                 setBookings([]);
+                setNextCursor(null);
                 return;
             }
 
             let filter: string | undefined;
+            let when: 'upcoming' | undefined;
             switch (activeTab) {
                 case 'upcoming':
+                    // Confirmed bookings that have not started, soonest first
                     filter = 'confirmed';
+                    when = 'upcoming';
                     break;
                 case 'completed':
                     filter = 'completed';
@@ -66,9 +82,11 @@ const MyBookingsScreen: React.FC = () => {
                     filter = undefined;
             }
 
-            const result = await bookingsApi.getUserBookings(user.id, filter);
+            const result = await bookingsApi.getUserBookings(user.id, filter, { when, cursor });
             if (result.success) {
-                setBookings(result.data || []);
+                const page = result.data || [];
+                setBookings((current) => (cursor ? [...current, ...page] : page));
+                setNextCursor(result.nextCursor);
             } else {
                 console.error('Error loading bookings:', result.error);
             }
@@ -77,9 +95,18 @@ const MyBookingsScreen: React.FC = () => {
         } finally {
             setLoading(false);
             setRefreshing(false);
+            setLoadingMore(false);
         }
     };
 
+    const loadMore = () => {
+        if (!nextCursor || loadingMore) {
+            return;
+        }
+        setLoadingMore(true);
+        loadBookings(nextCursor);
+    };
+
     useEffect(() => {
         loadBookings();
     }, [activeTab]);
@@ -151,8 +178,12 @@ const MyBookingsScreen: React.FC = () => {
                 <Text style={styles.bookingDate}>{formatDate(booking.booking_date)}</Text>
             </View>
 
-            <Text style={styles.venueName}>{booking.venue_name}</Text>
-            <Text style={styles.venueLocation}>{booking.venue_location}</Text>
+            <Text style={styles.venueName}>
+                {booking.court ? [booking.court.branch_name, booking.court.court_name].filter(Boolean).join(' - ') : booking.venue_name}
+            </Text>
+            <Text style={styles.venueLocation}>
+                {booking.court ? [booking.court.location, booking.court.city].filter(Boolean).join(', ') : booking.venue_location}
+            </Text>
 
             <View style={styles.detailsRow}>
                 <View style={styles.detailItem}>
@@ -260,6 +291,20 @@ const MyBookingsScreen: React.FC = () => {
                     ))
                 )}
 
+                {nextCursor && (
+                    <TouchableOpacity
+                        style={styles.loadMoreButton}
+                        onPress={loadMore}
+                        disabled={loadingMore}
+                    >
+                        {loadingMore ? (
+                            <ActivityIndicator size="small" color={colors.primary} />
+                        ) : (
+                            <Text style={styles.loadMoreText}>Load more</Text>
+                        )}
+                    </TouchableOpacity>
+                )}
+
                 {/* Spacer for bottom */}
                 <View style={{ height: hp(10) }} />
             </ScrollView>
@@ -417,6 +462,18 @@ const styles = StyleSheet.create({
     actionButton: {
         padding: wp(1),
     },
+    loadMoreButton: {
+        alignItems: 'center',
+        paddingVertical: hp(1.5),
+        marginBottom: hp(2),
+        borderRadius: moderateScale(12),
+        backgroundColor: colors.background.primary,
+    },
+    loadMoreText: {
+        fontSize: fontScale(14),
+        fontWeight: '600',
+        color: colors.primary,
+    },
     emptyContainer: {
         alignItems: 'center',
         paddingTop: hp(10),